@@ -20,22 +20,16 @@
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
+import time
+import random
 import string
 import unicodedata
-import urllib.request
-import gzip
 import io
+from html import unescape
 from urllib.error import HTTPError
 from abc import ABC, abstractmethod
-
-# Définition standard des codes courts et des noms
-STANDARD_SHORT_CODES = {
-    "cambridge": "Cam",
-    "collins": "Col",
-    "dictionary": "Dic",
-    "robert": "Rob",
-    "larousse": "Lar"
-}
+import requests
+from requests.adapters import HTTPAdapter
 
 # Standard definition of short codes and names
 STANDARD_SHORT_CODES = {
@@ -49,13 +43,34 @@ STANDARD_SHORT_CODES = {
 # Reverse mapping for lookup by short code
 STANDARD_NAMES = {v: k for k, v in STANDARD_SHORT_CODES.items()}
 
+# Regexes shared by all downloaders. `[^>]+` can only advance, unlike `.+?`
+# it never backtracks over the rest of the page.
+_CLEANER = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+# HTTP status codes worth retrying: rate limiting and server-side errors.
+# Any other HTTP error (e.g. 404) is final and raised immediately.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# HTTP session shared by all downloaders and threads. It keeps the
+# connections to each dictionary alive, so only the first request to a host
+# pays for the DNS lookup, the TCP connection and the TLS handshake.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 class DictionaryDownloader:
     """Base class for dictionary downloaders."""
     
+    max_retries = 3  # Number of retries after a transient network error
+    timeout = 30  # Timeout (in seconds) of each request
+    
     def __init__(self):
         self.name = "base"  # Override in subclasses
         self.short_code = "base"  # Override in subclasses
         self.language = "en"  # Override in subclasses with "en" or "fr"
+        self.base_url = None  # Override in subclasses with the home page of the dictionary
         self.headers = {
             'User-Agent':
                 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like '
@@ -111,28 +126,82 @@ class DictionaryDownloader:
         """
         pass
     
-    def get_html(self, url):
-        """Fetch HTML content from URL with proper headers.
+    def get_content(self, url):
+        """Fetch the raw content of URL with proper headers.
+        
+        Transient failures (timeouts, connection errors, HTTP 429 and 5xx)
+        are retried up to `max_retries` times with an exponential backoff
+        and some jitter, or after the delay asked by a Retry-After header.
         
         Args:
             url (str): URL to fetch
             
         Returns:
-            str: HTML content
+            bytes: Content of the page (decompressed if needed)
             
         Raises:
             HTTPError: If server returns an error
-            UnicodeDecodeError: If content cannot be decoded
+            requests.RequestException: If the server cannot be reached after
+                                       all retries
         """
-        req = urllib.request.Request(url, headers=self.headers)
-        response = urllib.request.urlopen(req)
+        attempt = 0
+        while True:
+            try:
+                response = SESSION.get(url, headers=self.headers, timeout=self.timeout)
+                if response.ok:
+                    return response.content
+                
+                # Keep raising urllib's HTTPError: the downloaders rely on it
+                error = HTTPError(url, response.status_code, response.reason,
+                                  response.headers, None)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    raise error
+                delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            
+            time.sleep(delay)
+            attempt += 1
+    
+    def warm_up(self):
+        """Open a connection to the dictionary ahead of the first download.
         
-        # Check if the response is compressed with gzip
-        if response.info().get('Content-Encoding') == 'gzip':
-            content = gzip.decompress(response.read())
-        else:
-            content = response.read()
+        Errors are ignored: the real requests will report them if needed.
+        """
+        if not self.base_url:
+            return
+        try:
+            SESSION.head(self.base_url, headers=self.headers, timeout=5)
+        except requests.RequestException:
+            pass
+    
+    @staticmethod
+    def _retry_delay(attempt, retry_after=None):
+        """Return the number of seconds to wait before the next attempt.
         
+        Args:
+            attempt (int): Number of the failed attempt (starting at 0)
+            retry_after (str): Value of the Retry-After header, if any
+            
+        Returns:
+            float: Delay in seconds (at most 30)
+        """
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), 30)
+        return min(2 ** attempt + random.random(), 30)
+    
+    @staticmethod
+    def decode_html(content):
+        """Decode raw HTML content to text.
+        
+        Args:
+            content (bytes): Raw HTML content
+            
+        Returns:
+            str: Decoded HTML content
+        """
         # Try utf-8 encoding first (most common case)
         try:
             return content.decode('utf-8')
@@ -147,18 +216,45 @@ class DictionaryDownloader:
             # As a last resort, use utf-8 with replacement of invalid characters
             return content.decode('utf-8', errors='replace')
     
-    def clean_html(self, html, pattern):
-        """Clean HTML tags from text.
+    def get_html(self, url):
+        """Fetch HTML content from URL with proper headers.
+        
+        Args:
+            url (str): URL to fetch
+            
+        Returns:
+            str: HTML content
+            
+        Raises:
+            HTTPError: If server returns an error
+            UnicodeDecodeError: If content cannot be decoded
+        """
+        return self.decode_html(self.get_content(url))
+    
+    def clean_html(self, html, pattern=None):
+        """Clean HTML tags from text and decode HTML entities.
         
         Args:
             html (str): HTML content
-            pattern (str): Regex pattern for HTML tags
+            pattern (str): Regex pattern for HTML tags (default: any tag)
             
         Returns:
             str: Cleaned text
         """
-        cleaner = re.compile(pattern, re.I|re.S)
-        return re.sub(cleaner, '', html)
+        cleaner = _CLEANER if pattern is None else re.compile(pattern, re.I|re.S)
+        return unescape(cleaner.sub('', html))
+    
+    @staticmethod
+    def element_text(element):
+        """Get the text of a parsed HTML element on a single line.
+        
+        Args:
+            element: BeautifulSoup element
+            
+        Returns:
+            str: Text of the element with whitespace normalized
+        """
+        return _WHITESPACE.sub(' ', element.get_text()).strip()
     
     @staticmethod
     def get_standard_short_code(name_or_code):
@@ -19,11 +19,13 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
-import re
+import logging
 from urllib.error import HTTPError
 from bs4 import BeautifulSoup
 from .base import DictionaryDownloader
 
+logger = logging.getLogger(__name__)
+
 class CambridgeDownloader(DictionaryDownloader):
     """Cambridge dictionary downloader."""
     
@@ -32,6 +34,7 @@ class CambridgeDownloader(DictionaryDownloader):
         self.name = "Cambridge"
         self.short_code = "Cam"
         self.language = "en"
+        self.base_url = "https://dictionary.cambridge.org/"
     
     def download(self, word, pos="all"):
         """Download definitions from Cambridge dictionary.
@@ -55,39 +58,21 @@ class CambridgeDownloader(DictionaryDownloader):
             html = self.get_html(URL)
             soup = BeautifulSoup(html, 'html.parser')
             
-            # Utiliser le nouveau sélecteur pour trouver toutes les définitions
-            all_definitions = soup.select('div.def')
-            
-            # Si besoin de filtrer par partie du discours (POS)
+            # Si besoin de filtrer par partie du discours (POS), ne garder que
+            # les définitions des blocs d'entrée correspondants
             if pos in ["adjective", "noun", "verb"]:
-                cleaned_defs = []
-                
-                # Trouver tous les blocs d'entrée
-                entry_blocks = soup.select('div.entry-body__el')
-                
-                for block in entry_blocks:
+                definitions = []
+                for block in soup.select('div.entry-body__el'):
                     # Chercher le type de partie du discours dans ce bloc
                     pos_element = block.select_one('span.pos')
-                    
-                    # Si la partie du discours correspond à celle demandée
                     if pos_element and pos in pos_element.text.lower():
-                        # Extraire les définitions de ce bloc
-                        definitions = block.select('div.def')
-                        for def_element in definitions:
-                            # Extraire le texte pur et le nettoyer
-                            text = def_element.get_text().strip()
-                            # Normaliser les espaces
-                            text = re.sub(r'\s+', ' ', text)
-                            cleaned_defs.append(text)
+                        definitions.extend(block.select('div.def'))
             else:
-                # Si aucun filtre de partie du discours, prendre toutes les définitions
-                cleaned_defs = []
-                for def_element in all_definitions:
-                    # Extraire le texte pur et le nettoyer
-                    text = def_element.get_text().strip()
-                    # Normaliser les espaces
-                    text = re.sub(r'\s+', ' ', text)
-                    cleaned_defs.append(text)
+                # Sinon, prendre toutes les définitions de la page
+                definitions = soup.select('div.def')
+            
+            # Extraire le texte pur et normaliser les espaces
+            cleaned_defs = [self.element_text(def_element) for def_element in definitions]
             
             # Si aucune définition n'a été trouvée
             if not cleaned_defs:
@@ -103,9 +88,7 @@ class CambridgeDownloader(DictionaryDownloader):
             return None, URL, error_msg
         except Exception as e:
             error_msg = f"Error for '{word}' in Cambridge dictionary: {str(e)}"
-            print(f"\nERROR: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("%s for '%s' in Cambridge dictionary", type(e).__name__, word)
             return None, URL, error_msg
 
 # Instance to be imported by the downloader module
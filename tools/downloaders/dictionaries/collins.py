@@ -19,12 +19,52 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
-import re
+import logging
 import random
 from urllib.error import HTTPError
 from bs4 import BeautifulSoup
 from .base import DictionaryDownloader
 
+logger = logging.getLogger(__name__)
+
+# Markers delimiting the definitions block of a Collins page. Locating them
+# with bytes.find is a plain linear scan, so we never run a lazy regex (or the
+# HTML parser) over the whole page, even when the markup is malformed. The
+# page is kept as raw bytes: all the markers are ASCII, and only the small
+# parts we keep need to be decoded.
+_DEFINITIONS_START = b'<div class="content definitions'
+_DEFINITIONS_END = b'<div class="div copyright'
+
+
+def _page_title(html):
+    """Return the content of the <title> tag of HTML (bytes), or None."""
+    start = html.find(b'<title')
+    if start == -1:
+        return None
+    start = html.find(b'>', start)
+    end = html.find(b'</title>', start)
+    if start == -1 or end == -1:
+        return None
+    return DictionaryDownloader.decode_html(html[start + 1:end]).strip()
+
+
+def _definition_blocks(html):
+    """Return the list of the parts of HTML (bytes) holding the definitions.
+
+    A page can contain several dictionary entries (British, American, ...),
+    each one ending with a copyright block, so all of them are kept.
+    """
+    blocks = []
+    start = html.find(_DEFINITIONS_START)
+    while start != -1:
+        end = html.find(_DEFINITIONS_END, start)
+        if end == -1:
+            blocks.append(html[start:])
+            break
+        blocks.append(html[start:end])
+        start = html.find(_DEFINITIONS_START, end)
+    return blocks
+
 class CollinsDownloader(DictionaryDownloader):
     """Collins dictionary downloader."""
     
@@ -33,6 +73,7 @@ class CollinsDownloader(DictionaryDownloader):
         self.name = "Collins"
         self.short_code = "Col"
         self.language = "en"
+        self.base_url = "https://www.collinsdictionary.com/"
         
         # Liste des User-Agents plus modernes
         self.user_agents = [
@@ -70,29 +111,32 @@ class CollinsDownloader(DictionaryDownloader):
                   - error_msg: Message d'erreur ou None si aucune erreur
         """
         URL = "https://www.collinsdictionary.com/dictionary/english/" + word
-        print(f"Requesting URL: {URL}")
+        logger.debug("Requesting URL: %s", URL)
 
         if pos not in ["all", "adjective", "noun", "verb"]:
             pos = "all"
 
         try:
-            html = self.get_html(URL)
-            
-            soup = BeautifulSoup(html, 'html.parser')
+            html = self.get_content(URL)
             
             # Vérifier le titre de la page
-            print(f"Titre de la page: {soup.title.string if soup.title else 'Pas de titre'}")
+            title = _page_title(html)
+            logger.debug("Titre de la page: %s", title if title else 'Pas de titre')
             
-            # Chercher les entrées et définitions
-            entries = soup.select('div.dictionary.Cob_Adv_Brit.dictentry')
-            print(f"Nombre d'entrées trouvées: {len(entries)}")
+            # Chercher les entrées et ne parser que leurs blocs de définitions.
+            # Si la mise en page change et qu'aucun bloc n'est trouvé, on
+            # parse la page entière comme avant.
+            blocks = _definition_blocks(html)
+            logger.debug("Nombre d'entrées trouvées: %d", len(blocks))
+            fragment = b"".join(blocks) if blocks else html
+            soup = BeautifulSoup(self.decode_html(fragment), 'html.parser')
             
             definitions = soup.select('div.def')
-            print(f"Nombre de définitions trouvées: {len(definitions)}")
+            logger.debug("Nombre de définitions trouvées: %d", len(definitions))
             
             # Si aucune définition n'est trouvée, essayer d'autres sélecteurs
             if not definitions:
-                print("Essai de sélecteurs alternatifs:")
+                logger.debug("Essai de sélecteurs alternatifs:")
                 selectors = [
                     '.def', 
                     '.hom .sense .def',
@@ -101,16 +145,14 @@ class CollinsDownloader(DictionaryDownloader):
                 ]
                 for selector in selectors:
                     elements = soup.select(selector)
-                    print(f"Sélecteur '{selector}': {len(elements)} éléments trouvés")
+                    logger.debug("Sélecteur '%s': %d éléments trouvés", selector, len(elements))
                     if elements:
-                        print(f"Premier élément trouvé: {elements[0].get_text().strip()}")
+                        logger.debug("Premier élément trouvé: %s", elements[0].get_text().strip())
             
             # Extraire toutes les définitions
             cleaned_defs = []
             for def_element in definitions:
-                text = def_element.get_text().strip()
-                text = re.sub(r'\s+', ' ', text)
-                cleaned_defs.append(text)
+                cleaned_defs.append(self.element_text(def_element))
 
             if not cleaned_defs:
                 return None, URL, f"No definition found for '{word}' in Collins dictionary"
@@ -119,7 +161,7 @@ class CollinsDownloader(DictionaryDownloader):
 
         except HTTPError as e:
             error_msg = f"HTTP Error {e.code} for '{word}' in Collins dictionary"
-            print(f"ERREUR HTTP: {error_msg}")
+            logger.warning("ERREUR HTTP: %s", error_msg)
             return None, URL, error_msg
         except UnicodeDecodeError as e:
             error_msg = f"Unicode decode error for '{word}' in Collins dictionary: {str(e)}"
@@ -129,9 +171,7 @@ class CollinsDownloader(DictionaryDownloader):
             return None, URL, error_msg
         except Exception as e:
             error_msg = f"Error for '{word}' in Collins dictionary: {str(e)}"
-            print(f"\nERROR: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("%s for '%s' in Collins dictionary", type(e).__name__, word)
             return None, URL, error_msg
 
 # Instance to be imported by the downloader module
@@ -19,11 +19,18 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
-import re
+import logging
 from urllib.error import HTTPError
+import soupsieve as sv
 from bs4 import BeautifulSoup
 from .base import DictionaryDownloader
 
+logger = logging.getLogger(__name__)
+
+# CSS selectors compiled once at import instead of on every lookup
+_DEFINITIONS = sv.compile('div.NZKOFkdkcvYgD3lqOIJw > div')
+_POS = sv.compile('span.pos')
+
 class DictionaryDotComDownloader(DictionaryDownloader):
     """Dictionary.com dictionary downloader."""
     
@@ -32,6 +39,7 @@ class DictionaryDotComDownloader(DictionaryDownloader):
         self.name = "Dictionary.com"
         self.short_code = "Dic"
         self.language = "en"
+        self.base_url = "http://www.dictionary.com/"
     
     def download(self, word, pos="all"):
         """Download definitions from Dictionary.com.
@@ -55,40 +63,27 @@ class DictionaryDotComDownloader(DictionaryDownloader):
             html = self.get_html(URL)
             soup = BeautifulSoup(html, 'html.parser')
             
-            # Find all definitions using the CSS selector
-            definition_elements = soup.select('div.NZKOFkdkcvYgD3lqOIJw > div')
-            
             # Extract definitions and filter by POS if needed
             cleaned_defs = []
             
             if pos in ["adjective", "noun", "verb"]:
                 # We need to find sections with the requested POS
                 # This implementation depends on the actual structure of Dictionary.com
-                # Assuming POS information is available in elements with a certain class
-                sections = soup.find_all(lambda tag: tag.name == 'span' and 
-                                                    'pos' in tag.get('class', []))
-                
-                for section in sections:
+                # Assuming POS information is available in span elements with a "pos" class
+                for section in _POS.select(soup):
                     if pos in section.text.lower():
                         # Find the parent section containing this POS
                         parent_section = section.find_parent('section')
                         if parent_section:
                             # Find all definitions in this section
-                            pos_definitions = parent_section.select('div.NZKOFkdkcvYgD3lqOIJw > div')
-                            for def_element in pos_definitions:
-                                # Get text content only
-                                text = def_element.get_text().strip()
-                                # Normalize whitespace
-                                text = re.sub(r'\s+', ' ', text)
-                                cleaned_defs.append(text)
+                            for def_element in _DEFINITIONS.select(parent_section):
+                                # Get text content only, whitespace normalized
+                                cleaned_defs.append(self.element_text(def_element))
             else:
                 # Extract all definitions if no POS filter
-                for def_element in definition_elements:
-                    # Get text content only
-                    text = def_element.get_text().strip()
-                    # Normalize whitespace
-                    text = re.sub(r'\s+', ' ', text)
-                    cleaned_defs.append(text)
+                for def_element in _DEFINITIONS.select(soup):
+                    # Get text content only, whitespace normalized
+                    cleaned_defs.append(self.element_text(def_element))
             
             if not cleaned_defs:
                 return None, URL, f"No definition found for '{word}' in Dictionary.com"
@@ -106,8 +101,7 @@ class DictionaryDotComDownloader(DictionaryDownloader):
             return None, URL, error_msg
         except Exception as e:
             error_msg = f"Error for '{word}' in Dictionary.com: {str(e)}"
-            print("\nERROR: * timeout error.")
-            print("       * retry dictionary.com -", word)
+            logger.warning("timeout error, retry dictionary.com - %s", word)
             return None, URL, error_msg
 
 # Instance to be imported by the downloader module
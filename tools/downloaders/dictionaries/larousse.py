@@ -18,12 +18,14 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
-import re
+import logging
 import urllib.parse
 from urllib.error import HTTPError
 from bs4 import BeautifulSoup
 from .base import DictionaryDownloader, remove_diacritics
 
+logger = logging.getLogger(__name__)
+
 class LarousseDownloader(DictionaryDownloader):
     """Larousse dictionary downloader for French."""
     
@@ -32,6 +34,7 @@ class LarousseDownloader(DictionaryDownloader):
         self.name = "Larousse"
         self.short_code = "Lar"
         self.language = "fr"
+        self.base_url = "https://www.larousse.fr/"
         # Update headers for French content
         self.headers['Accept-Language'] = 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7'
     
@@ -71,7 +74,7 @@ class LarousseDownloader(DictionaryDownloader):
             if not definitions_list:
                 # Word not found - this is not a fatal error
                 error_msg = f"Word '{word}' not found in Larousse"
-                print(f"\nWARNING: '{word}' not found in Larousse dictionary.")
+                logger.warning("'%s' not found in Larousse dictionary.", word)
                 return None, used_url, error_msg
                 
             definitions = []
@@ -93,11 +96,8 @@ class LarousseDownloader(DictionaryDownloader):
                 for example in definition_copy.find_all(class_='ExempleDefinition'):
                     example.decompose()
                 
-                # Get the cleaned text
-                clean_text = definition_copy.get_text().strip()
-                
-                # Clean extra whitespace
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+                # Get the cleaned text, without extra whitespace
+                clean_text = self.element_text(definition_copy)
                 
                 # Add the cleaned definition
                 if clean_text:
@@ -115,7 +115,7 @@ class LarousseDownloader(DictionaryDownloader):
                 if pos != "all":
                     warning_msg += f" as {pos}"
                 warning_msg += " in Larousse."
-                print(f"\nWARNING: {warning_msg}")
+                logger.warning(warning_msg)
                 return None, used_url, error_msg
                 
             return definitions, None, None
@@ -130,17 +130,17 @@ class LarousseDownloader(DictionaryDownloader):
             }.get(e.code, f"HTTP error {e.code}")
             
             error_msg = f"Error {e.code}: {error_type} for '{word}'"
-            print(f"\nWARNING: HTTP error ({e.code}: {error_type}) for '{word}' in Larousse.")
+            logger.warning("HTTP error (%d: %s) for '%s' in Larousse.", e.code, error_type, word)
             return None, used_url, error_msg
             
         except UnicodeDecodeError as e:
             error_msg = f"Unicode decode error for '{word}': {str(e)}"
-            print(f"\nWARNING: Unicode decode error for '{word}' in Larousse.")
+            logger.warning("Unicode decode error for '%s' in Larousse.", word)
             return None, used_url, error_msg
             
         except Exception as e:
             error_msg = f"Technical error for '{word}': {str(e)}"
-            print(f"\nWARNING: Error for '{word}' in Larousse: {str(e)}")
+            logger.warning("Error for '%s' in Larousse: %s", word, e)
             return None, used_url, error_msg
 
 # Instance to be imported by the downloader module
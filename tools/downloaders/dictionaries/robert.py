@@ -19,11 +19,14 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
 import urllib.parse
 from urllib.error import HTTPError
 from bs4 import BeautifulSoup
 from .base import DictionaryDownloader, remove_diacritics
 
+logger = logging.getLogger(__name__)
+
 class RobertDownloader(DictionaryDownloader):
     """Le Robert dictionary downloader."""
     
@@ -32,6 +35,7 @@ class RobertDownloader(DictionaryDownloader):
         self.name = "Le Robert"
         self.short_code = "Rob"
         self.language = "fr"
+        self.base_url = "https://dictionnaire.lerobert.com/"
         # Update headers for French content
         self.headers['Accept-Language'] = 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7'
     
@@ -79,7 +83,7 @@ class RobertDownloader(DictionaryDownloader):
             if soup.find("section", class_="def") is None:
                 # If the word doesn't exist with the version without diacritics, try with the original version
                 if normalized_word != word:
-                    print(f"\nINFO: Trying alternative URL with original spelling for '{word}'")
+                    logger.info("Trying alternative URL with original spelling for '%s'", word)
                     try:
                         html_fallback = self.get_html(fallback_url)
                         soup = BeautifulSoup(html_fallback, 'html.parser')
@@ -88,22 +92,22 @@ class RobertDownloader(DictionaryDownloader):
                         if soup.find("section", class_="def") is None:
                             # Word not found - this is not a fatal error
                             error_msg = f"Word '{word}' not found in Le Robert"
-                            print(f"\nWARNING: '{word}' not found in Le Robert dictionary.")
+                            logger.warning("'%s' not found in Le Robert dictionary.", word)
                             return None, used_url, error_msg
                     except HTTPError as e:
                         # Word not found - this is not a fatal error
                         error_msg = f"HTTP Error {e.code} when accessing the page with accents"
-                        print(f"\nWARNING: '{word}' not found in Le Robert dictionary.")
+                        logger.warning("'%s' not found in Le Robert dictionary.", word)
                         return None, fallback_url, error_msg
                     except Exception as e:
                         # Any other error - this is not a fatal error
                         error_msg = f"Error when accessing the page with accents: {str(e)}"
-                        print(f"\nWARNING: Error for '{word}' in Le Robert: {str(e)}")
+                        logger.warning("Error for '%s' in Le Robert: %s", word, e)
                         return None, fallback_url, error_msg
                 else:
                     # Word not found - this is not a fatal error
                     error_msg = f"Word '{word}' not found in Le Robert"
-                    print(f"\nWARNING: '{word}' not found in Le Robert dictionary.")
+                    logger.warning("'%s' not found in Le Robert dictionary.", word)
                     return None, used_url, error_msg
                 
             definitions = []
@@ -114,13 +118,13 @@ class RobertDownloader(DictionaryDownloader):
                 for section in soup.find_all("section", class_="def"):
                     # For each section, find all definitions with the d_dfn class
                     for def_entry in section.find_all(class_="d_dfn"):
-                        definition_text = def_entry.get_text().strip()
+                        definition_text = self.element_text(def_entry)
                         if definition_text:
                             definitions.append(definition_text)
                             
                     # Also look for definitions in elements with the d_gls class
                     for gls_entry in section.find_all(class_="d_gls"):
-                        gls_text = gls_entry.get_text().strip()
+                        gls_text = self.element_text(gls_entry)
                         if gls_text:
                             definitions.append(gls_text)
             else:
@@ -131,13 +135,13 @@ class RobertDownloader(DictionaryDownloader):
                     if pos_element and pos.lower() in pos_element.get_text().lower():
                         # Look for definitions with the d_dfn class
                         for def_entry in section.find_all(class_="d_dfn"):
-                            definition_text = def_entry.get_text().strip()
+                            definition_text = self.element_text(def_entry)
                             if definition_text:
                                 definitions.append(definition_text)
                         
                         # Also look for definitions in elements with the d_gls class
                         for gls_entry in section.find_all(class_="d_gls"):
-                            gls_text = gls_entry.get_text().strip()
+                            gls_text = self.element_text(gls_entry)
                             if gls_text:
                                 definitions.append(gls_text)
             
@@ -153,7 +157,7 @@ class RobertDownloader(DictionaryDownloader):
                 if pos != "all":
                     warning_msg += f" as {pos}"
                 warning_msg += " in Le Robert."
-                print(f"\nWARNING: {warning_msg}")
+                logger.warning(warning_msg)
                 return None, used_url, error_msg
                 
             return definitions, None, None
@@ -168,17 +172,17 @@ class RobertDownloader(DictionaryDownloader):
             }.get(e.code, f"HTTP error {e.code}")
             
             error_msg = f"Error {e.code}: {error_type} for '{word}'"
-            print(f"\nWARNING: HTTP error ({e.code}: {error_type}) for '{word}' in Le Robert.")
+            logger.warning("HTTP error (%d: %s) for '%s' in Le Robert.", e.code, error_type, word)
             return None, used_url, error_msg
             
         except UnicodeDecodeError as e:
             error_msg = f"Unicode decode error for '{word}': {str(e)}"
-            print(f"\nWARNING: Unicode decode error for '{word}' in Le Robert.")
+            logger.warning("Unicode decode error for '%s' in Le Robert.", word)
             return None, used_url, error_msg
             
         except Exception as e:
             error_msg = f"Technical error for '{word}': {str(e)}"
-            print(f"\nWARNING: Error for '{word}' in Le Robert: {str(e)}")
+            logger.warning("Error for '%s' in Le Robert: %s", word, e)
             return None, used_url, error_msg
 
 # Instance to be imported by the downloader module
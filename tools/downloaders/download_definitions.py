@@ -21,11 +21,13 @@
 
 from queue import Queue
 from threading import Thread, Lock
+from logging.handlers import QueueHandler, QueueListener
 from multiprocessing import cpu_count
-from downloader import download_word_definition
+from downloader import download_word_definition, warm_up_connection
 from dictionaries import get_language_downloaders, DictionaryDownloader
 from os.path import splitext, isfile, join, exists, basename, dirname
 import argparse
+import logging
 import time
 import sys
 import os
@@ -45,6 +47,27 @@ request_counter = {}
 download_counter = {}
 not_found_words = []  # List to store words not found, their URLs and error messages
 
+def setup_logging(level=logging.INFO):
+    """Route the log records of the downloaders through a queue.
+
+    The worker threads only push records into the queue; a single listener
+    thread formats them and writes them to stdout, so threads never wait on
+    the terminal when many downloads fail at the same time.
+
+    Returns:
+        QueueListener: the started listener, to stop once downloads are done
+    """
+    log_queue = Queue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("\n%(levelname)s: %(message)s"))
+    listener = QueueListener(log_queue, handler)
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(level)
+    listener.start()
+    return listener
+
 class ThreadDown(Thread):
     """Class representing a thread that download definitions."""
     def __init__(self, dict_name, pos, data_queue, res_queue, ignore_warnings=False):
@@ -185,6 +208,12 @@ def main(filename, pos="all", lang="en", output_dir="data/output/definitions", m
         os.makedirs(temp_dir)
         print(f"Created temporary directory: {temp_dir}")
 
+    # Open the connections to the dictionaries of the language in the
+    # background, while the word list is read
+    for downloader in get_language_downloaders(lang).values():
+        Thread(target=warm_up_connection, args=(downloader.short_code,),
+               daemon=True).start()
+
     # 1. read the file to get the list of words to download definitions
     vocabulary = set()
     with open(filename) as f:
@@ -585,7 +614,11 @@ if __name__ == '__main__':
         print("It can be EN or FR. Using default language (EN)\n")
         args.lang = "en"
 
-    main(args.list_words, pos=args.pos, lang=args.lang, output_dir=args.output_dir, 
-         min_word_length=args.min_length, use_stopwords=not args.no_stopwords, stopwords_file=args.stopwords,
-         max_iterations=args.iterations, max_definitions=args.max_definitions,
-         ignore_warnings=args.ignore_warnings)
+    log_listener = setup_logging()
+    try:
+        main(args.list_words, pos=args.pos, lang=args.lang, output_dir=args.output_dir, 
+             min_word_length=args.min_length, use_stopwords=not args.no_stopwords, stopwords_file=args.stopwords,
+             max_iterations=args.iterations, max_definitions=args.max_definitions,
+             ignore_warnings=args.ignore_warnings)
+    finally:
+        log_listener.stop()
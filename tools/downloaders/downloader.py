@@ -19,26 +19,155 @@
 # You should have received a copy of the GNU General Public License
 # along with Dict2vec.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
 import string
+import logging
+import unicodedata
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dictionaries import get_downloader, DictionaryDownloader
 
-# Load English stopwords
-STOPWORDS_EN = set()
-try:
-    with open('dict-dl/stopwords_en.txt') as f:
-        for line in f:
-            STOPWORDS_EN.add(line.strip().lower())
-except FileNotFoundError:
-    print("WARNING: English stopwords file not found")
-
-# Load French stopwords
-STOPWORDS_FR = set()
-try:
-    with open('dict-dl/stopwords_fr.txt') as f:
-        for line in f:
-            STOPWORDS_FR.add(line.strip().lower())
-except FileNotFoundError:
-    print("WARNING: French stopwords file not found")
+logger = logging.getLogger(__name__)
+
+def load_stopwords(filename, language):
+    """Read the stopwords file FILENAME and return its words as a frozenset.
+
+    Args:
+        filename (str): path to the stopwords file (one word per line)
+        language (str): name of the language, used in the warning message
+
+    Returns:
+        frozenset: lowercased NFC-normalized (and interned) stopwords,
+                   empty if the file does not exist
+    """
+    try:
+        text = Path(filename).read_text(encoding='utf-8')
+        return frozenset(map(sys.intern, unicodedata.normalize("NFC", text).lower().split()))
+    except FileNotFoundError:
+        print(f"WARNING: {language} stopwords file not found")
+        return frozenset()
+
+STOPWORDS_EN = load_stopwords('dict-dl/stopwords_en.txt', "English")
+STOPWORDS_FR = load_stopwords('dict-dl/stopwords_fr.txt', "French")
+
+class _AsciiLetterTable(dict):
+    """str.translate() table keeping only the ASCII letters (lowercased).
+
+    Whitespace is mapped to a plain space so that the words can still be
+    split afterwards, every other character is deleted. Codepoints above 255
+    are resolved the first time they are seen and then memoized.
+    """
+    def __missing__(self, codepoint):
+        value = ord(' ') if chr(codepoint).isspace() else None
+        self[codepoint] = value
+        return value
+
+_ASCII_LETTER_TABLE = _AsciiLetterTable({i: None for i in range(256)})
+for _c in range(256):
+    if chr(_c).isspace():
+        _ASCII_LETTER_TABLE[_c] = ord(' ')
+for _c in range(ord('a'), ord('z') + 1):
+    _ASCII_LETTER_TABLE[_c] = _c
+for _c in range(ord('A'), ord('Z') + 1):
+    _ASCII_LETTER_TABLE[_c] = _c + 32
+del _c
+
+class _PunctuationTable(dict):
+    """str.translate() table deleting punctuation and symbols.
+
+    Starts with string.punctuation; other codepoints are looked up in the
+    Unicode database (categories P* and S*) the first time they are seen and
+    then memoized, so French quotes, dashes or typographic apostrophes are
+    removed as well.
+    """
+    def __missing__(self, codepoint):
+        value = None if unicodedata.category(chr(codepoint))[0] in "PS" else codepoint
+        self[codepoint] = value
+        return value
+
+# Removes all the punctuation of a word in one pass
+_PUNCT_STRIP = _PunctuationTable(str.maketrans("", "", string.punctuation))
+
+class _LetterTable(dict):
+    """str.translate() table keeping only the letters (lowercased, accents
+    included).
+
+    Whitespace and apostrophes (ASCII and typographic) are mapped to a plain
+    space so that "l'une" gives "l une" instead of "lune", every other
+    character is deleted. Entries are computed the first time a codepoint is
+    seen and then memoized.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char.isalpha():
+            value = char.lower()
+        elif char.isspace() or char in "'\u2019":
+            value = ' '
+        else:
+            value = None
+        self[codepoint] = value
+        return value
+
+_LETTER_TABLE = _LetterTable()
+
+def _clean_en(definition):
+    """Split an English DEFINITION into lowercased words without stopwords.
+
+    Only the ASCII letters of the definition are kept, in one pass over the
+    whole definition.
+
+    Args:
+        definition (str): the definition to clean
+
+    Returns:
+        list: the words of the definition
+    """
+    return [w for w in definition.translate(_ASCII_LETTER_TABLE).split()
+            if w not in STOPWORDS_EN]
+
+def _clean_fr(definition):
+    """Split a French DEFINITION into lowercased words without stopwords.
+
+    Accents are kept and the other non-alphabetic characters removed.
+
+    Args:
+        definition (str): the definition to clean
+
+    Returns:
+        list: the words of the definition
+    """
+    # Normalize to NFC first so that precomposed and decomposed
+    # accents give the same word (and match the stopwords), then keep only
+    # the lowercased letters in one pass and split into words
+    processed_def = unicodedata.normalize("NFC", definition).translate(_LETTER_TABLE)
+    return [w for w in processed_def.split() if w not in STOPWORDS_FR]
+
+# Dictionaries whose connection has already been warmed up
+_warmed_up_dictionaries = set()
+_warm_up_lock = threading.Lock()
+
+def warm_up_connection(dict_name):
+    """Open the connection to the dictionary DICT_NAME ahead of its first
+    download.
+
+    The first request to a host pays for the DNS lookup, the TCP connection
+    and the TLS handshake. A caller that has other work to do before
+    downloading (reading the word list...) can call this first, e.g. in a
+    thread, to overlap this latency with that work. Only the first call for
+    a given dictionary does something. It is not called by the download
+    functions themselves: there the first GET opens the connection anyway.
+
+    Args:
+        dict_name (str): name or short code of the dictionary
+    """
+    downloader = get_downloader(dict_name)
+    # The lock only protects the set, the request is done outside of it
+    with _warm_up_lock:
+        if downloader.name in _warmed_up_dictionaries:
+            return
+        _warmed_up_dictionaries.add(downloader.name)
+    downloader.warm_up()
 
 def download_word_definition(dict_name, word, pos="all", clean=True):
     """Download the definition(s) of WORD according to the part-of-speech POS
@@ -66,9 +195,7 @@ def download_word_definition(dict_name, word, pos="all", clean=True):
         original_word = word  # Keep the original word for error messages
         if clean:
             # remove trailing punctuation and make it lowercase
-            for p in string.punctuation:
-                word = word.replace(p, "")
-            word = word.lower()
+            word = word.translate(_PUNCT_STRIP).lower()
                 
         # Get definitions - standardized format (definitions, url, error_msg)
         definitions, url, error_msg = downloader.download(word, pos)
@@ -78,37 +205,16 @@ def download_word_definition(dict_name, word, pos="all", clean=True):
             return None, url, error_msg
         
         # If we got here, we have definitions
+        # if no cleaning needed, return the whole definitions
+        if not clean:
+            return list(definitions)
+
+        # Select the cleaning function (and its stopwords) once per call
+        clean_definition = _clean_fr if downloader.language == "fr" else _clean_en
+
         words = []
-        # Select the appropriate stopwords set based on the dictionary
-        stopwords = STOPWORDS_EN
-        if downloader.language == "fr":
-            stopwords = STOPWORDS_FR
-        
         for definition in definitions: # there can be more than one definition fetched
-            # if no cleaning needed, add the whole definition
-            if not clean:
-                words.append(definition)
-                continue
-
-            # For French, handle apostrophes specially
-            if downloader.language == "fr":
-                # Pre-processing: replace apostrophes with space + word
-                # Example: "l'une" becomes "l une" instead of "lune"
-                processed_def = definition.replace("'", " ")
-                processed_def = processed_def.replace("'", " ")  # Typographic apostrophe
-                
-                # Split definition into words using spaces
-                for word in processed_def.split():
-                    # Clean each word keeping accents but removing non-alphabetic characters
-                    word = ''.join([c.lower() for c in word if c.isalpha()])
-                    if word and word not in stopwords:
-                        words.append(word)
-            else:
-                # For English, continue with existing processing
-                for word in definition.split():
-                    word = ''.join([c.lower() for c in word if c.isalpha() and ord(c) < 128])
-                    if word and word not in stopwords:
-                        words.append(word)
+            words.extend(clean_definition(definition))
 
         return words
         
@@ -122,10 +228,33 @@ def download_word_definition(dict_name, word, pos="all", clean=True):
             pass
             
         error_msg = f"Error for '{original_word}' in {dict_name_display}: {str(e)}"
-        print(f"\nWARNING: Error for '{original_word}' in {dict_name_display}: {str(e)}")
+        logger.warning(error_msg)
         
         return None, "", error_msg
 
+def download_word_definitions(dict_name, words, pos="all", clean=True, max_workers=32):
+    """Download the definition(s) of all the WORDS from the dictionary
+       DICT_NAME, several requests being in flight at the same time.
+
+    Args:
+        dict_name (str): name of the dictionary (see download_word_definition)
+        words (list): the words we want to download definitions
+        pos (str): part-of-speech of the wanted definitions
+        clean (bool): whether to cleanup the words or not
+        max_workers (int): maximum number of concurrent requests
+
+    Returns:
+        list: for each word, in the same order, the result of
+              download_word_definition
+    """
+    words = list(words)
+    if not words:
+        return []
+    with ThreadPoolExecutor(min(max_workers, len(words))) as executor:
+        return list(executor.map(
+            lambda word: download_word_definition(dict_name, word, pos, clean),
+            words))
+
 if __name__ == '__main__':
     print("-- TEST : definitions of wick --")
     print("Cambridge")
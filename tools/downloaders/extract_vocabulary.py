@@ -5,6 +5,19 @@ import sys
 import re
 import argparse
 
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# For ASCII lines: lowercase the letters and turn every character that is
+# not a word character ([a-z0-9_]) into a space, so that a plain split()
+# gives the same words as _WORD_RE
+_ASCII_WORD_TABLE = {
+    i: (chr(i).lower() if chr(i).isalnum() or chr(i) == '_' else ' ')
+    for i in range(128)
+}
+
+# Number of words joined together for each write of the vocabulary file
+WRITE_BATCH_SIZE = 8192
+
 def extract_vocabulary(input_file, output_dir=None):
     """
     Extract unique words from a definitions file and save them to a vocabulary file.
@@ -18,15 +31,16 @@ def extract_vocabulary(input_file, output_dir=None):
         str: Path to the output file or None if an error occurred
     """
     try:
-        # Read the input file
+        # Read the input file line by line, only keeping the unique words
+        unique = set()
         with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split content into words
-        words = re.findall(r'\b\w+\b', content.lower())
+            for line in f:
+                if line.isascii():
+                    unique.update(line.translate(_ASCII_WORD_TABLE).split())
+                else:
+                    unique.update(_WORD_RE.findall(line.lower()))
         
-        # Get unique words
-        unique_words = sorted(set(words))
+        unique_words = sorted(unique)
         
         # Set default output directory if not provided
         if output_dir is None:
@@ -43,9 +57,13 @@ def extract_vocabulary(input_file, output_dir=None):
         
         output_file = os.path.join(output_dir, output_basename)
         
-        # Write unique words to output file
+        # Write unique words to output file, by batches to avoid building
+        # the whole file content in memory
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(unique_words))
+            for start in range(0, len(unique_words), WRITE_BATCH_SIZE):
+                if start:
+                    f.write('\n')
+                f.write('\n'.join(unique_words[start:start + WRITE_BATCH_SIZE]))
         
         print(f"Extracted {len(unique_words)} unique words from {input_file}")
         print(f"Saved vocabulary to {output_file}")
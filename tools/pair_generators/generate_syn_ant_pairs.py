@@ -11,10 +11,32 @@ import json
 import argparse
 import os
 import re
+import shutil
+import multiprocessing
+from functools import lru_cache
 from typing import List, Dict, Set, Tuple
 
+# orjson parses the Wiktionary entries 2-3x faster than the standard json
+# module; its decode errors subclass json.JSONDecodeError
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
-def load_vocabulary(filename: str) -> List[str]:
+
+# Matches the value of every "word" field of a raw JSONL line (including the
+# nested ones, e.g. in "synonyms"), escaped characters included
+_WORD_FIELD_RE = re.compile(rb'"word"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# At least two standard alphanumeric characters, common accents, hyphens or
+# apostrophes (so no spaces, no emoji and no other special characters)
+_VALID_WORD_RE = re.compile(r'^[a-zA-ZÀ-ÖØ-öø-ÿ0-9\-\']{2,}$')
+
+# Number of pairs kept in memory before being written to the output files
+WRITE_BUFFER_SIZE = 10000
+
+
+def load_vocabulary(filename: str) -> Set[str]:
     """
     Load a vocabulary file containing one word per line.
     
@@ -22,12 +44,13 @@ def load_vocabulary(filename: str) -> List[str]:
         filename: Path to the vocabulary file
     
     Returns:
-        List of words from the vocabulary
+        Set of words from the vocabulary
     """
     with open(filename, 'r', encoding='utf-8') as f:
-        return [line.strip() for line in f if line.strip()]
+        return {word for word in (line.strip() for line in f) if word}
 
 
+@lru_cache(maxsize=65536)
 def is_valid_word(word: str) -> bool:
     """
     Check if a word is valid (not a single character, no spaces, no emoji/special characters).
@@ -38,18 +61,26 @@ def is_valid_word(word: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    # Skip words with spaces
-    if " " in word:
-        return False
+    return _VALID_WORD_RE.match(word) is not None
+
+
+def may_have_vocabulary_word(line: bytes, vocabulary: Set[str]) -> bool:
+    """
+    Cheap pre-filter run on a raw JSONL line before parsing it.
     
-    # Skip single character words
-    if len(word) <= 1:
-        return False
+    Args:
+        line: Raw line of the Wiktionary jsonl file
+        vocabulary: Set of words from the vocabulary
     
-    # Check if the word contains only standard alphanumeric characters and common accents
-    # This will filter out emoji and other special characters
-    pattern = re.compile(r'^[a-zA-ZÀ-ÖØ-öø-ÿ0-9\-\']+$')
-    return bool(pattern.match(word))
+    Returns:
+        False if the entry word is certainly not in the vocabulary, True if
+        the line has to be parsed to know
+    """
+    for value in _WORD_FIELD_RE.findall(line):
+        # Escaped values cannot be compared without decoding the JSON string
+        if b'\\' in value or value.decode('utf-8', 'replace') in vocabulary:
+            return True
+    return False
 
 
 def extract_related_words(entry: Dict, relation_keys: List[str]) -> List[str]:
@@ -61,7 +92,8 @@ def extract_related_words(entry: Dict, relation_keys: List[str]) -> List[str]:
         relation_keys: List of keys to look for (e.g., ["synonyms", "hyponyms", "forms"])
     
     Returns:
-        List of related words extracted from the specified keys
+        List of related words extracted from the specified keys, without
+        duplicates (first occurrence order is kept)
     """
     related_words = []
     
@@ -80,79 +112,206 @@ def extract_related_words(entry: Dict, relation_keys: List[str]) -> List[str]:
                     if is_valid_word(item):
                         related_words.append(item)
     
-    return related_words
+    # The same word can come from several keys (e.g. a form also listed as
+    # a synonym): keep it once to avoid writing the same pair twice
+    return list(dict.fromkeys(related_words))
 
 
-def generate_pairs(vocabulary_fn: str, wiktionary_fn: str) -> Tuple[int, int]:
+# Relation keys extracted as synonyms and as antonyms
+SYNONYM_KEYS = ["synonyms", "hyponyms", "forms"]
+ANTONYM_KEYS = ["antonyms"]
+
+# Vocabulary of the worker processes, set once by init_worker()
+_worker_vocabulary: Set[str] = set()
+
+
+def init_worker(vocabulary: Set[str]) -> None:
     """
-    Generate synonym and antonym pairs from vocabulary and Wiktionary data.
+    Initializer of the worker processes: keep the vocabulary in a global so
+    it is sent once per process instead of once per chunk.
     
     Args:
-        vocabulary_fn: Path to the vocabulary file (one word per line)
-        wiktionary_fn: Path to the Wiktionary jsonl file
+        vocabulary: Set of words from the vocabulary
+    """
+    global _worker_vocabulary
+    _worker_vocabulary = vocabulary
+
+
+def split_in_chunks(filename: str, n_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into byte ranges of roughly the same size.
+    
+    Args:
+        filename: Path to the file to split
+        n_chunks: Number of chunks wanted
     
     Returns:
-        Tuple containing the count of synonym pairs and antonym pairs generated
+        List of (start, end) byte offsets, the last end being the file size
     """
-    # Define fixed output paths
-    output_dir = "data/output/pairs"
-    synonyms_fn = os.path.join(output_dir, "syn-pairs.txt")
-    antonyms_fn = os.path.join(output_dir, "ant-pairs.txt")
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    size = os.path.getsize(filename)
+    bounds = [size * i // n_chunks for i in range(n_chunks + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def process_chunk(task: Tuple[int, str, int, int, str, str]) -> Tuple[int, int]:
+    """
+    Generate the synonym and antonym pairs of the Wiktionary entries whose
+    line starts in the byte range [start, end) of the jsonl file.
     
-    # Load vocabulary
-    print(f"Loading vocabulary from {vocabulary_fn}...")
-    vocabulary = load_vocabulary(vocabulary_fn)
-    print(f"Loaded {len(vocabulary)} words from vocabulary.")
+    Args:
+        task: Tuple (chunk index, path to the Wiktionary jsonl file, start
+              offset, end offset, synonyms output path, antonyms output path)
     
-    # Set up relation keys to extract
-    synonym_keys = ["synonyms", "hyponyms", "forms"]
-    antonym_keys = ["antonyms"]
+    Returns:
+        Tuple containing the count of synonym pairs and antonym pairs generated
+    """
+    index, wiktionary_fn, start, end, synonyms_fn, antonyms_fn = task
+    vocabulary = _worker_vocabulary
     
     # Set up counters for pairs
     synonym_count = 0
     antonym_count = 0
     
+    # Pairs waiting to be written
+    syn_buffer = []
+    ant_buffer = []
+    
     # Open output files
     with open(synonyms_fn, 'w', encoding='utf-8') as syn_file, \
          open(antonyms_fn, 'w', encoding='utf-8') as ant_file, \
-         open(wiktionary_fn, 'r', encoding='utf-8') as wiki_file:
+         open(wiktionary_fn, 'rb') as wiki_file:
         
-        print(f"Processing Wiktionary data from {wiktionary_fn}...")
+        # Go to the first line starting in the chunk (the line overlapping
+        # the chunk start belongs to the previous chunk)
+        position = start
+        if start > 0:
+            wiki_file.seek(start - 1)
+            position += len(wiki_file.readline()) - 1
         
-        # Process each line in the jsonl file
-        for line_num, line in enumerate(wiki_file, 1):
+        # Process each line of the chunk
+        line_num = 0
+        while position < end:
+            line = wiki_file.readline()
+            if not line:
+                break
+            position += len(line)
+            line_num += 1
+            
             if line_num % 10000 == 0:
-                print(f"Processed {line_num} entries...")
+                print(f"Chunk {index}: processed {line_num} entries...")
+            
+            # Most entries are not in the vocabulary: skip them without
+            # paying for a full JSON parse
+            if not may_have_vocabulary_word(line, vocabulary):
+                continue
             
             try:
-                entry = json.loads(line)
+                entry = json_loads(line)
                 
                 # Check if the word is in our vocabulary
                 if "word" in entry and entry["word"] in vocabulary:
                     word = entry["word"]
                     
                     # Extract synonyms (and related words)
-                    synonyms = extract_related_words(entry, synonym_keys)
+                    synonyms = extract_related_words(entry, SYNONYM_KEYS)
                     
                     # Extract antonyms
-                    antonyms = extract_related_words(entry, antonym_keys)
+                    antonyms = extract_related_words(entry, ANTONYM_KEYS)
                     
-                    # Write synonym pairs
-                    for synonym in synonyms:
-                        syn_file.write(f"{word} {synonym}\n")
-                        synonym_count += 1
+                    # Every pair of this entry starts with the same word
+                    prefix = word + " "
                     
-                    # Write antonym pairs
-                    for antonym in antonyms:
-                        ant_file.write(f"{word} {antonym}\n")
-                        antonym_count += 1
+                    # Buffer synonym pairs
+                    syn_buffer.extend([prefix + synonym + "\n" for synonym in synonyms])
+                    synonym_count += len(synonyms)
+                    
+                    # Buffer antonym pairs
+                    ant_buffer.extend([prefix + antonym + "\n" for antonym in antonyms])
+                    antonym_count += len(antonyms)
+                    
+                    # Write the pairs by batches
+                    if len(syn_buffer) >= WRITE_BUFFER_SIZE:
+                        syn_file.write("".join(syn_buffer))
+                        syn_buffer.clear()
+                    if len(ant_buffer) >= WRITE_BUFFER_SIZE:
+                        ant_file.write("".join(ant_buffer))
+                        ant_buffer.clear()
             
-            except json.JSONDecodeError:
-                print(f"Warning: Could not parse JSON on line {line_num}, skipping...")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                print(f"Warning: Could not parse JSON on line {line_num} of chunk {index}, skipping...")
                 continue
+        
+        # Write the remaining pairs
+        syn_file.write("".join(syn_buffer))
+        ant_file.write("".join(ant_buffer))
+    
+    return synonym_count, antonym_count
+
+
+def concatenate_parts(part_fns: List[str], output_fn: str) -> None:
+    """
+    Concatenate the part files in order into OUTPUT_FN and delete them.
+    
+    Args:
+        part_fns: Paths to the part files
+        output_fn: Path to the output file
+    """
+    with open(output_fn, 'wb') as output_file:
+        for part_fn in part_fns:
+            with open(part_fn, 'rb') as part_file:
+                shutil.copyfileobj(part_file, output_file)
+            os.remove(part_fn)
+
+
+def generate_pairs(vocabulary_fn: str, wiktionary_fn: str, n_processes: int = 1) -> Tuple[int, int]:
+    """
+    Generate synonym and antonym pairs from vocabulary and Wiktionary data.
+    
+    The Wiktionary file is split into one chunk per process; each chunk is
+    written to its own part files, concatenated in order at the end.
+    
+    Args:
+        vocabulary_fn: Path to the vocabulary file (one word per line)
+        wiktionary_fn: Path to the Wiktionary jsonl file
+        n_processes: Number of worker processes
+    
+    Returns:
+        Tuple containing the count of synonym pairs and antonym pairs generated
+    """
+    # Define fixed output paths
+    output_dir = "data/output/pairs"
+    synonyms_fn = os.path.join(output_dir, "syn-pairs.txt")
+    antonyms_fn = os.path.join(output_dir, "ant-pairs.txt")
+    
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Load vocabulary
+    print(f"Loading vocabulary from {vocabulary_fn}...")
+    vocabulary = load_vocabulary(vocabulary_fn)
+    print(f"Loaded {len(vocabulary)} words from vocabulary.")
+    
+    print(f"Processing Wiktionary data from {wiktionary_fn}...")
+    tasks = [
+        (index, wiktionary_fn, start, end,
+         f"{synonyms_fn}.part{index:02d}", f"{antonyms_fn}.part{index:02d}")
+        for index, (start, end) in enumerate(split_in_chunks(wiktionary_fn, max(1, n_processes)))
+    ]
+    
+    if n_processes > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(n_processes, initializer=init_worker,
+                                  initargs=(vocabulary,)) as pool:
+            counts = pool.map(process_chunk, tasks)
+    else:
+        init_worker(vocabulary)
+        counts = [process_chunk(task) for task in tasks]
+    
+    # Merge the parts of each chunk
+    concatenate_parts([task[4] for task in tasks], synonyms_fn)
+    concatenate_parts([task[5] for task in tasks], antonyms_fn)
+    
+    synonym_count = sum(count[0] for count in counts)
+    antonym_count = sum(count[1] for count in counts)
     
     print(f"Generated {synonym_count} synonym pairs in {synonyms_fn}")
     print(f"Generated {antonym_count} antonym pairs in {antonyms_fn}")
@@ -171,7 +330,10 @@ if __name__ == "__main__":
     parser.add_argument('-w', '--wiktionary', 
                         help="JSONL file containing Wiktionary extracts.",
                         required=True)
+    parser.add_argument('-p', '--processes', type=int,
+                        help="Number of worker processes (default: number of CPUs).",
+                        default=os.cpu_count() or 1)
     
     args = parser.parse_args()
     
-    generate_pairs(args.vocabulary, args.wiktionary) 
\ No newline at end of file
+    generate_pairs(args.vocabulary, args.wiktionary, args.processes) 
\ No newline at end of file
@@ -24,14 +24,15 @@ import os.path
 import argparse
 import numpy as np
 import time
+from multiprocessing import Pool
 from numpy.linalg import norm
-from collections import Counter
 
-
-def cosineSim(v1, v2):
-    """Return the cosine similarity between v1 and v2 (numpy arrays)"""
-    dot_prod = np.dot(v1, v2)
-    return dot_prod / (norm(v1) * norm(v2))
+# faiss is optional: when available, its exact inner-product index finds the
+# closest words (product and top-K selection in one tuned kernel)
+try:
+    import faiss
+except ImportError:
+    faiss = None
 
 
 def loadEmbedding(filename, list_words):
@@ -39,15 +40,20 @@ def loadEmbedding(filename, list_words):
     Read the file <filename> and generate the embedding matrix. Only load
     embeddings of words in <list_words>. There is no reason to load the
     embedding of a word if we are not going to do computation with it.
+
+    The file is read only once: the values of the kept words are gathered as
+    text and converted to floats in a single numpy call.
     """
 
-    # Read the file to get the number of words and the embedding dimension
-    print("   Reading \"{}\" to get the dimension and the number of"
-          " words ... ".format(filename), end="")
-    nb_word = 0
+    # membership is tested for every line of the file
+    if not isinstance(list_words, (set, frozenset)):
+        list_words = set(list_words)
+
+    print("   Reading \"{}\" ... ".format(filename), end="")
     nb_dims = 0
-    valid_words = []  # Liste pour stocker les mots valides qui seront effectivement chargés
-    
+    words = []  # mots effectivement chargés, dans l'ordre du fichier
+    rows = []   # valeurs (texte) de chaque mot chargé
+
     try:
         with open(filename) as f:
             first_line = f.readline().split()
@@ -56,149 +62,83 @@ def loadEmbedding(filename, list_words):
                 try:
                     total_vecs = int(first_line[0])
                     nb_dims = int(first_line[1])
-                    print(f"Done.\n   File contains {total_vecs} vectors of dimension {nb_dims}")
-                    
-                    # Count how many words from list_words are in the embedding file
-                    for line in f:
-                        parts = line.split()
-                        if len(parts) > 1:  # Assurez-vous que la ligne a suffisamment de parties
-                            word = parts[0]
-                            if word in list_words:
-                                try:
-                                    # Vérifiez que tous les éléments (après le mot) peuvent être convertis en float
-                                    _ = [float(x) for x in parts[1:]]
-                                    valid_words.append(word)
-                                    nb_word += 1
-                                except ValueError:
-                                    # Ignorer les lignes avec des valeurs non numériques
-                                    print(f"\n   Warning: Skipping line with word '{word}' due to non-numeric values")
-                                    continue
+                    print(f"\n   File contains {total_vecs} vectors of dimension {nb_dims} ... ", end="")
+                    first_line = None
                 except ValueError:
                     # Si la première ligne n'est pas au format attendu, on la traite comme un vecteur
-                    word = first_line[0]
-                    nb_dims = len(first_line) - 1
-                    
-                    if word in list_words:
-                        try:
-                            # Vérifiez que tous les éléments (après le mot) peuvent être convertis en float
-                            _ = [float(x) for x in first_line[1:]]
-                            valid_words.append(word)
-                            nb_word += 1
-                        except ValueError:
-                            print(f"\n   Warning: Skipping first line with word '{word}' due to non-numeric values")
-                    
-                    # for each line, add 1 to nb_word if word is in list_words
-                    for line in f:
-                        parts = line.split()
-                        if len(parts) > 1:
-                            word = parts[0]
-                            if word in list_words:
-                                try:
-                                    # Vérifiez que tous les éléments (après le mot) peuvent être convertis en float
-                                    _ = [float(x) for x in parts[1:]]
-                                    valid_words.append(word)
-                                    nb_word += 1
-                                except ValueError:
-                                    print(f"\n   Warning: Skipping line with word '{word}' due to non-numeric values")
-                                    continue
-            else:
-                # La première ligne contient déjà un vecteur
-                word = first_line[0]
+                    pass
+
+            # La première ligne contient déjà un vecteur
+            if first_line and len(first_line) > 1:
                 nb_dims = len(first_line) - 1
-                
-                if word in list_words:
-                    try:
-                        # Vérifiez que tous les éléments (après le mot) peuvent être convertis en float
-                        _ = [float(x) for x in first_line[1:]]
-                        valid_words.append(word)
-                        nb_word += 1
-                    except ValueError:
-                        print(f"\n   Warning: Skipping first line with word '{word}' due to non-numeric values")
-                
-                # for each line, add 1 to nb_word if word is in list_words
-                for line in f:
-                    parts = line.split()
-                    if len(parts) > 1:
-                        word = parts[0]
-                        if word in list_words:
-                            try:
-                                # Vérifiez que tous les éléments (après le mot) peuvent être convertis en float
-                                _ = [float(x) for x in parts[1:]]
-                                valid_words.append(word)
-                                nb_word += 1
-                            except ValueError:
-                                print(f"\n   Warning: Skipping line with word '{word}' due to non-numeric values")
-                                continue
+                if first_line[0] in list_words:
+                    words.append(first_line[0])
+                    rows.append(' '.join(first_line[1:]))
+
+            for line in f:
+                parts = line.split(maxsplit=1)
+                if len(parts) > 1 and parts[0] in list_words:
+                    # rows with the wrong number of values are skipped here:
+                    # the bulk conversion below only checks the total size,
+                    # which a too short and a too long row would both pass
+                    if len(parts[1].split()) != nb_dims:
+                        print(f"\n   Warning: Skipping line with word '{parts[0]}' due to wrong dimension")
+                        continue
+                    words.append(parts[0])
+                    rows.append(parts[1])
     except Exception as e:
         print(f"\n   Error reading embedding file: {str(e)}")
         raise
 
+    print("Done.")
     print("   Loading {} embeddings of dimension"
-          " {} ... ".format(nb_word, nb_dims), end="")
-
-    # each row is the embedding of a word
-    embedding = np.zeros((nb_word, nb_dims))
+          " {} ... ".format(len(words), nb_dims), end="")
 
-    # dictionaries to map each word and their respective index
-    numToWords, wordsToNum = {}, {}
-
-    # Read again the file to extract embeddings and put them into the matrix
-    with open(filename) as f:
-        # Skip the first line if it contains just metadata (nb_vecs and dimensions)
-        first_line = f.readline().split()
-        if len(first_line) == 2:
+    # each row is the embedding of a word. Single precision is enough to
+    # rank the similarities and halves the memory read by the products
+    try:
+        values = np.fromstring(' '.join(rows), dtype=np.float32, sep=' ')
+    except ValueError:
+        # non-numeric values (older numpy versions stop parsing instead)
+        values = None
+    if values is not None and values.size == len(words) * nb_dims:
+        embedding = values.reshape(len(words), nb_dims)
+    else:
+        # Some lines are malformed: parse each of them to skip the bad ones
+        embedding, kept_words = [], []
+        for word, row in zip(words, rows):
             try:
-                int(first_line[0])
-                int(first_line[1])
-                # C'est une ligne d'en-tête, on la saute
-                first_line = None
+                vals = np.array(row.split(), dtype=np.float32)
             except ValueError:
-                # C'est un vecteur, on doit le traiter
-                pass
-        
-        idx = 0
-        
-        # Traiter la première ligne si elle contient un vecteur
-        if first_line and len(first_line) > 2:
-            word = first_line[0]
-            if word in valid_words:
-                try:
-                    vals = list(map(float, first_line[1:]))
-                    embedding[idx] = vals
-                    numToWords[idx] = word
-                    wordsToNum[word] = idx
-                    idx += 1
-                except ValueError:
-                    # Ignorer cette ligne en cas d'erreur (déjà filtré avant)
-                    pass
-        
-        # Traiter le reste du fichier
-        for line in f:
-            parts = line.split()
-            if not parts or len(parts) <= 1:  # Skip empty or too short lines
+                print(f"\n   Warning: Skipping line with word '{word}' due to non-numeric values")
                 continue
-                
-            word = parts[0]
-            # add embedding only if the word is in valid_words (filtré précédemment)
-            if word in valid_words:
-                try:
-                    vals = list(map(float, parts[1:]))
-                    embedding[idx] = vals
-                    numToWords[idx] = word
-                    wordsToNum[word] = idx
-                    idx += 1
-                except ValueError:
-                    # Ignorer cette ligne en cas d'erreur (déjà filtré avant)
-                    continue
+            if vals.size != nb_dims:
+                print(f"\n   Warning: Skipping line with word '{word}' due to wrong dimension")
+                continue
+            embedding.append(vals)
+            kept_words.append(word)
+        words = kept_words
+        embedding = np.array(embedding, dtype=np.float32).reshape(len(words), nb_dims)
+    del values, rows
+
+    # dictionaries to map each word and their respective index
+    numToWords = dict(enumerate(words))
+    wordsToNum = {word: idx for idx, word in numToWords.items()}
 
     print("Done.")
     
-    if nb_word > 0:
+    # The products of closestWords() expect a C-contiguous float32 matrix
+    # (no hidden copy or conversion). Both branches above already build one,
+    # so this does not copy anything.
+    embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+
+    if len(words) > 0:
         print("   Normalizing the embeddings ... ", end="")
         # norm(., axis=1) gives the norm of each rows. It is an array with
         # dimension (n, ). To divide each coefficicent of embedding with the
-        # corresponding norm, we need to reshape the array to (n, 1)
-        embedding = embedding / norm(embedding, axis=1)[:, np.newaxis]
+        # corresponding norm, we need to reshape the array to (n, 1). The
+        # division is done in place to avoid a second copy of the matrix
+        embedding /= norm(embedding, axis=1)[:, np.newaxis]
         print("Done.")
     else:
         print("\n   Warning: No valid embeddings found!")
@@ -206,7 +146,109 @@ def loadEmbedding(filename, list_words):
     return embedding, numToWords, wordsToNum
 
 
-def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K):
+def closestWords(embedding, query_indexes, K, block_size=512):
+    """
+    Find the K+1 closest words of each word of <query_indexes> (indexes of
+    rows in <embedding>). Returns a dictionary mapping each query index to
+    the array of the indexes of its K+1 closest words.
+
+    Instead of taking each row of the embedding matrix and computing the
+    cosine similarity with the embedding of a query word and take the K best
+    scores, we do the product between the embedding matrix and the
+    embeddings of the query words. Because our embedding matrix is
+    normalized, we'll get a matrix containing all cosine similarities (one
+    column per query word). Then we only need to find the K indexes of the
+    maximum scores of each column with the argpartition function. But we'll
+    compute the dot product between each query word and itself (hence
+    getting a cosine sim of 1). So we need to get the K+1 best scores of
+    similarities.
+
+    The query words are processed by blocks of <block_size> columns, so that
+    the embedding matrix is read once per block instead of once per word
+    while the similarity matrix stays of bounded size. If faiss is installed,
+    an exact inner-product index (IndexFlatIP) does the same search.
+    """
+    if faiss is not None:
+        index = faiss.IndexFlatIP(embedding.shape[1])
+        index.add(np.ascontiguousarray(embedding, dtype=np.float32))
+        _, max_indexes = index.search(
+            np.ascontiguousarray(embedding[query_indexes], dtype=np.float32), K+1)
+        return dict(zip(query_indexes.tolist(), max_indexes))
+
+    closest = {}
+    for start in range(0, len(query_indexes), block_size):
+        block = query_indexes[start:start + block_size]
+        cosine_sim = embedding.dot(embedding[block].T)
+        max_indexes = np.argpartition(cosine_sim, -(K+1), axis=0)[-(K+1):]
+        for column, index in enumerate(block.tolist()):
+            closest[index] = max_indexes[:, column]
+
+    return closest
+
+# Read-only data used by naturalPairs(), set in each worker process by
+# initPairsWorker() (or directly when running in a single process)
+_pairs_data = {}
+
+
+def initPairsWorker(dictionary, wordToId, wordsToNum, K):
+    """Store the data needed by naturalPairs() in the current process."""
+    _pairs_data["dictionary"] = dictionary
+    _pairs_data["wordToId"] = wordToId
+    _pairs_data["wordsToNum"] = wordsToNum
+    _pairs_data["K"] = K
+
+
+def naturalPairs(words):
+    """
+    Generate the natural strong and weak pairs of all the words in <words>.
+    Return (strong, weak, natural_strong): the pairs are packed integer keys
+    (see generate_pairs) and natural_strong lists the (word, definition_token)
+    strong pairs to use for the artificial pairs generation.
+    """
+    dictionary = _pairs_data["dictionary"]
+    wordToId = _pairs_data["wordToId"]
+    wordsToNum = _pairs_data["wordsToNum"]
+    K = _pairs_data["K"]
+
+    weak, strong = set(), set()
+    natural_strong = []
+    for word in words:
+        word_id = wordToId[word]
+        for definition_token in dictionary[word]:
+
+            # case 0: word is used in its definition. Obvious strong pair,
+            # but not interesting.
+            if word == definition_token:
+                continue
+
+            # case 1: strong pair
+            # Some words (like eurynome) are in vocabulary, and are used in
+            # some definitions, but do not have a definition themselves. So
+            # we need to be sure that definition_token is in the dictionary.
+            if definition_token in dictionary and \
+               word in dictionary[definition_token]:
+
+                # use alphabetical order -> no duplicate
+                i1, i2 = word_id, wordToId[definition_token]
+                strong.add((i1 << 32 | i2) if i1 < i2 else (i2 << 32 | i1))
+
+                # |- Artificial strong pairs generation -|
+                # to create more strong pairs, we need the embedding of
+                # definition_token. If it does not exist, can't do anything.
+                # The closest words are searched for all the pairs at once,
+                # in generate_pairs.
+                if K > 0 and definition_token in wordsToNum:
+                    natural_strong.append((word, definition_token))
+
+            # case 2: weak pair
+            else:
+                i1, i2 = word_id, wordToId[definition_token]
+                weak.add((i1 << 32 | i2) if i1 < i2 else (i2 << 32 | i1))
+
+    return strong, weak, natural_strong
+
+
+def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K, n_processes=1):
     """
     Generate weak and strong pairs of words based on definitions in
     defs_fn. A and B are a strong pair if :
@@ -216,6 +258,7 @@ def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K):
     are considered as a weak pair.
 
     If K > 0, artificial strong pairs are also generated using word embeddings.
+    The natural pairs are generated with <n_processes> processes.
     """
 
     # load all words and their definitions.
@@ -225,16 +268,16 @@ def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K):
     dictionary = {}
     uniq_words = set() # list of all words in definition_file
 
-    with open(definition_fn) as f:
+    with open(definition_fn, buffering=1<<20) as f:
         for line in f:
-            ar = line.strip().split()
-            # use Counter to take into account the number of occurence
-            # of each definition words
-            word, definition_words = ar[0], Counter(ar[1:])
+            ar = line.split() # split() already drops the newline
+            # only the presence of each definition word is used (the
+            # number of occurences is never read)
+            word, definition_words = ar[0], set(ar[1:])
             dictionary[word] = definition_words
 
             uniq_words.add(word)
-            uniq_words.update(set(ar[1:]))
+            uniq_words.update(definition_words)
 
     print("Done.")
     print("   Entries in \"{}\": {}".format(definition_fn, len(dictionary)))
@@ -254,85 +297,63 @@ def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K):
 
     # generate strong and weak pairs
     print("\n-- Generating strong and weak pairs")
+    # Each word gets an id following the alphabetical order, and a pair is
+    # stored as one integer (smallest id << 32 | largest id): cheaper to hash
+    # and smaller than a tuple of two strings, and ordering the ids is the
+    # same as ordering the words alphabetically.
+    idToWord = sorted(uniq_words)
+    wordToId = {w: i for i, w in enumerate(idToWord)}
     weak, strong = set(), set()
-
-    nb_words_done = 0;
-    for word in dictionary:
-        nb_words_done += 1
-        if nb_words_done % 100 == 0:
+    natural_strong = [] # (word, definition_token) to use for artificial pairs
+
+    # The words are processed by chunks, in parallel if n_processes > 1:
+    # each chunk gives its own pairs, merged here.
+    words = list(dictionary)
+    chunk_size = max(1, min(10000, len(words) // (n_processes * 4) + 1))
+    chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+
+    def mergePairs(results):
+        nb_words_done = 0
+        for chunk, (local_strong, local_weak, local_natural) in zip(chunks, results):
+            strong.update(local_strong)
+            weak.update(local_weak)
+            natural_strong.extend(local_natural)
+            nb_words_done += len(chunk)
             progress = nb_words_done / len(dictionary) * 100
             print("\r", "{:.2f}%".format(progress), end="")
 
-        for definition_token in dictionary[word]:
-
-            # case 0: word is used in its definition. Obvious strong pair,
-            # but not interesting.
-            if word == definition_token:
-                continue
-
-            # case 1: strong pair
-            # Some words (like eurynome) are in vocabulary, and are used in
-            # some definitions, but do not have a definition themselves. So
-            # we need to be sure that definition_token is in the dictionary.
-            if definition_token in dictionary and \
-               word in dictionary[definition_token]:
-
-                # use alphabetical order -> no duplicate
-                w1, w2 = min(word, definition_token), max(word,definition_token)
-                if not (w1,w2) in strong:
-                    strong.add((w1,w2))
-
-                # |- Artificial strong pairs generation -|
-                if K > 0:
-
-                    # to create more strong pairs, we need the embedding of
-                    # definition_token. If it does not exist, can't do anything
-                    if not definition_token in wordsToNum:
-                        continue
-
-                    embed_def_token = embedding[wordsToNum[definition_token]]
-
-                    # To generate K other strong pairs, we need to find the K
-                    # closest word to definition_token. Then we can create the
-                    # pairs :
-                    #   * (word, closest_1)
-                    #   * (word, closest_2)
-                    #   * ...
-                    #   * (word, closest_K)
-                    #
-                    # Instead of taking each row of the embedding matrix and
-                    # computing the cosine similarity with embed_def_token and
-                    # take the K best scores, we do the dot product between the
-                    # embedding matrix and embed_def_token. Because our
-                    # embedding matrix is normalized, we'll get a vector
-                    # containing all cosine similarities. Then we only need to
-                    # find the K indexes of the maximum scores with the
-                    # argpartition function. But when we compute the dot product
-                    # between the matrix and the vector, we'll compute the dot
-                    # product between embed_def_token and itself (hence getting
-                    # a cosine sim of 1). So we need to get the K+1 best scores
-                    # of similarities.
-
-                    #start = time.time()
-                    cosine_sim = embedding.dot(embed_def_token)
-                    max_indexes = np.argpartition(cosine_sim, -(K+1))[-(K+1):]
-                    #duree = time.time() - start
-                    #print("duree:", duree, "\n")
-
-                    for index in max_indexes:
-                        close_word = numToWords[index]
-
-                        if close_word != definition_token:
-                            #print(close_word, "\t", cosine_sim[index])
-                            w1, w2 = min(word,close_word), max(word,close_word)
-                            strong.add((w1,w2))
-
-            # case 2: weak pair
-            else:
-                w1, w2 = min(word, definition_token), max(word,definition_token)
-                if not (w1,w2) in weak:
-                    weak.add((w1,w2))
+    if n_processes > 1:
+        with Pool(n_processes, initializer=initPairsWorker,
+                  initargs=(dictionary, wordToId, wordsToNum, K)) as pool:
+            mergePairs(pool.imap(naturalPairs, chunks))
+    else:
+        initPairsWorker(dictionary, wordToId, wordsToNum, K)
+        mergePairs(map(naturalPairs, chunks))
+        _pairs_data.clear()
+
+    # |- Artificial strong pairs generation -|
+    if K > 0 and natural_strong:
+        print("\n   Searching the {} closest words of the definition"
+              " tokens ... ".format(K), end="")
+        query_indexes = np.array(sorted({wordsToNum[definition_token]
+                                         for _, definition_token in natural_strong}))
+        closest = closestWords(embedding, query_indexes, K)
+        print("Done.")
 
+        # To generate K other strong pairs, we need to find the K closest
+        # word to definition_token. Then we can create the pairs :
+        #   * (word, closest_1)
+        #   * (word, closest_2)
+        #   * ...
+        #   * (word, closest_K)
+        for word, definition_token in natural_strong:
+            word_id = wordToId[word]
+            for index in closest[wordsToNum[definition_token]]:
+                close_word = numToWords[index]
+
+                if close_word != definition_token:
+                    i1, i2 = word_id, wordToId[close_word]
+                    strong.add((i1 << 32 | i2) if i1 < i2 else (i2 << 32 | i1))
 
     # write pairs into files
     print("\n\n-- Writing pairs")
@@ -340,17 +361,16 @@ def generate_pairs(definition_fn, embedding_fn, strg_fn, weak_fn, K):
     output_dir = "data/output/pairs"
     os.makedirs(output_dir, exist_ok=True)
     
-    strg_of = open(os.path.join(output_dir, "{}-K{}.txt".format(strg_fn, K)), "w")
-    weak_of = open(os.path.join(output_dir, "{}-K{}.txt".format(weak_fn, K)), "w")
-
-    for s in strong:
-        strg_of.write(' '.join(s) + '\n')
-
-    for s in weak:
-        weak_of.write(' '.join(s) + '\n')
+    # one buffered writelines per file instead of one write per pair
+    with open(os.path.join(output_dir, "{}-K{}.txt".format(strg_fn, K)), "w",
+              buffering=1<<20) as strg_of:
+        strg_of.writelines(idToWord[pair >> 32] + ' ' + idToWord[pair & 0xFFFFFFFF] + '\n'
+                           for pair in strong)
 
-    strg_of.close()
-    weak_of.close()
+    with open(os.path.join(output_dir, "{}-K{}.txt".format(weak_fn, K)), "w",
+              buffering=1<<20) as weak_of:
+        weak_of.writelines(idToWord[pair >> 32] + ' ' + idToWord[pair & 0xFFFFFFFF] + '\n'
+                           for pair in weak)
 
     total = (len(strong) + len(weak)) / 100.0
     print("   # strong pairs: % 8d (%.2f%%)" % (len(strong), len(strong)/total))
@@ -380,11 +400,15 @@ if __name__ == "__main__":
                         pairs for each natural strong pair (default: 5).
                         Set to 0 to generate only natural strong pairs.""",
                         default=5, type=int)
+    parser.add_argument('-p', '--processes', help="""Number of processes used
+                        to generate the natural pairs (default: 1).""",
+                        default=1, type=int)
     args = parser.parse_args()
 
     generate_pairs(args.definitions,
                    args.embedding,
                    args.strong_file,
                    args.weak_file,
-                   args.K
+                   args.K,
+                   max(1, args.processes)
                   )
@@ -1,13 +1,22 @@
 import networkx as nx
 import argparse
-import random
 import numpy as np
 import torch
 import torch.multiprocessing as mp
+from multiprocessing import shared_memory
+from itertools import accumulate
+from bisect import bisect_right
 from functools import lru_cache
 import time
 from tqdm import tqdm
 
+# numba is optional: with it, the walks run in compiled parallel threads of
+# a single process instead of one Python process per output file
+try:
+    import walk_kernels
+except ImportError:
+    walk_kernels = None
+
 
 def load_graph(input_file):
     """Load graph once and cache the result"""
@@ -16,61 +25,166 @@ def load_graph(input_file):
     return G, list(G.nodes())
 
 
-def output_edges(args, index):
+def build_csr(G, node_list):
+    """Convert the graph into CSR arrays.
+
+    Node i is node_list[i]. Its neighbors are indices[indptr[i]:indptr[i+1]]
+    (sorted, so membership can be tested with a binary search) and the
+    weights of the corresponding edges are in weights[indptr[i]:indptr[i+1]].
+
+    Returns:
+        node_values: integer value of each node label (written in the output)
+        indptr, indices, weights: CSR adjacency of the graph
+    """
+    node_to_id = {node: i for i, node in enumerate(node_list)}
+    node_values = np.array([int(node) for node in node_list], dtype=int)
+    indptr = np.zeros(len(node_list) + 1, dtype=np.int64)
+    indices, weights = [], []
+    for i, node in enumerate(node_list):
+        row = sorted((node_to_id[nbr], data['weight']) for nbr, data in G.adj[node].items())
+        indices.extend(nbr for nbr, _ in row)
+        weights.extend(weight for _, weight in row)
+        indptr[i + 1] = len(indices)
+    return node_values, indptr, np.array(indices, dtype=np.int64), np.array(weights, dtype=float)
+
+
+def share_arrays(arrays):
+    """Copy arrays into shared memory blocks.
+
+    Returns:
+        blocks: the SharedMemory blocks (to close and unlink when done)
+        descriptors: (name, shape, dtype) of each array, for attach_arrays
+    """
+    blocks, descriptors = [], []
+    for array in arrays:
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        descriptors.append((block.name, array.shape, array.dtype.str))
+    return blocks, descriptors
+
+
+def attach_arrays(descriptors):
+    """Map the arrays shared by share_arrays (no copy).
+
+    Returns:
+        blocks: the SharedMemory blocks, to keep alive while using the arrays
+        arrays: the numpy arrays
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in descriptors]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+              for block, (_, shape, dtype) in zip(blocks, descriptors)]
+    return blocks, arrays
+
+
+# Below this degree, the neighbors of a node are weighted and drawn with
+# plain Python lists: numpy calls cost more than they save on tiny slices
+SMALL_DEGREE = 32
+
+
+def neighbors_weight(indptr, indices, weights, current, last, p, q):
+    """Return the neighbors of node `current` and their node2vec weights
+    given the previous node `last` (-1 at the start of a walk), as lists for
+    nodes of small degree and as numpy arrays otherwise."""
+    start, end = indptr[current], indptr[current + 1]
+    if last >= 0:
+        last_start, last_end = indptr[last], indptr[last + 1]
+    else:
+        last_start = last_end = 0
+    
+    if end - start <= SMALL_DEGREE and last_end - last_start <= SMALL_DEGREE:
+        neighbors = indices[start:end].tolist()
+        last_neighbors = set(indices[last_start:last_end].tolist())
+        neighbors_w = []
+        for nbr, weight in zip(neighbors, weights[start:end].tolist()):
+            if nbr == last:  # d = 0
+                neighbors_w.append(p * weight)
+            elif nbr in last_neighbors:  # d = 1
+                neighbors_w.append(weight)
+            else:
+                neighbors_w.append(q * weight)  # d = 2
+        return neighbors, neighbors_w
+    
+    neighbors = indices[start:end]
+    factors = np.full(end - start, q)  # d = 2
+    if last >= 0:
+        last_neighbors = indices[last_start:last_end]
+        if len(last_neighbors):
+            pos = np.searchsorted(last_neighbors, neighbors)
+            pos[pos == len(last_neighbors)] = 0
+            factors[last_neighbors[pos] == neighbors] = 1.0  # d = 1
+        factors[neighbors == last] = p  # d = 0
+    return neighbors, weights[start:end] * factors
+
+
+def sample_index(sampling_weights, rng):
+    """Draw an index with probability proportional to the (non-negative)
+    sampling_weights (list or numpy array), using the numpy Generator rng.
+    Return None if all the weights are zero."""
+    if isinstance(sampling_weights, list):
+        cumulative = list(accumulate(sampling_weights))
+        if cumulative[-1] <= 0:
+            return None
+        return min(bisect_right(cumulative, rng.random() * cumulative[-1]),
+                   len(cumulative) - 1)
+    cumulative = np.cumsum(sampling_weights)
+    if cumulative[-1] <= 0:
+        return None
+    return min(int(cumulative.searchsorted(rng.random() * cumulative[-1], side='right')),
+               len(cumulative) - 1)
+
+
+def output_edges(args, index, shared_csr):
     start_time = time.time()
     p = 1.0 / args.p
     q = 1.0 / args.q
-    # Construct Graph
-    G, node_list = load_graph(args.input_file)
+    # Graph loaded once by the parent process, shared as CSR arrays
+    blocks, (node_values, indptr, indices, weights) = attach_arrays(shared_csr)
+    n_nodes = len(node_values)
     
     # Initialize
     n_samples = args.n_samples
     if n_samples == -1:
-        n_samples = len(node_list)
+        n_samples = n_nodes
     output_array = np.zeros((n_samples, args.max_length), dtype=int)
     print(f"Process {index}: Output array shape {output_array.shape}")
     
+    # Each process has its own generator, seeded from fresh OS entropy:
+    # forked processes would otherwise share the same random state
+    rng = np.random.default_rng()
+    
     # Create shuffled indices more efficiently
-    indices = np.random.permutation(n_samples)
+    indices_order = rng.permutation(n_samples)
     
     # Use tqdm for progress tracking
     pbar = tqdm(total=n_samples, desc=f"Process {index}", position=index)
     
     for n in range(0, n_samples):
-        last_node = 0
+        last_node = -1
         # if selecting all nodes, start from a random node
-        if n_samples == len(node_list):
-            current_node = node_list[indices[n]]
+        if n_samples == n_nodes:
+            current_node = indices_order[n]
         else:
-            current_node = random.choice(node_list)
-        output_array[n, 0] = current_node
+            current_node = rng.integers(n_nodes)
+        output_array[n, 0] = node_values[current_node]
         # iterate max_length times
         for i in range(1, args.max_length):
-            neighbors = list(G.neighbors(current_node))
-            if not neighbors:
+            if indptr[current_node] == indptr[current_node + 1]:
                 break
-                
-            neighbors_weight = []
-            for nbr in neighbors:
-                weight = G.edges[(current_node, nbr)]['weight']
-                if nbr == last_node:  # d = 0
-                    neighbors_weight.append(p * weight)
-                elif G.has_edge(last_node, nbr):  # d = 1
-                    neighbors_weight.append(weight)
-                else:
-                    neighbors_weight.append(q * weight)  # d = 2
+            neighbors, neighbors_w = neighbors_weight(indptr, indices, weights,
+                                                      current_node, last_node, p, q)
                     
             last_node = current_node
             
             # Handle the case where all weights are zero
-            if sum(neighbors_weight) <= 0:
+            current_idx = sample_index(neighbors_w, rng)
+            if current_idx is None:
                 # If all weights are zero, use equal weights instead
-                current_node = random.choice(neighbors)
+                current_idx = rng.integers(len(neighbors))
                 print(f"Process {index}: Warning - Zero weights encountered at sample {n}, path position {i}. Using random selection.")
-            else:
-                current_node = random.choices(neighbors, weights=neighbors_weight, k=1)[0]
+            current_node = neighbors[current_idx]
                 
-            output_array[n, i] = current_node
+            output_array[n, i] = node_values[current_node]
         
         # Update progress bar
         pbar.update(1)
@@ -93,77 +207,74 @@ def output_edges(args, index):
     print(f"Process {index}: Completed in {execution_time:.2f} seconds")
 
 
-def output_polar_edges(args, index):
+def output_polar_edges(args, index, shared_csr):
     start_time = time.time()
     p = 1.0 / args.p
     q = 1.0 / args.q
-    # Construct Graph
-    G, node_list = load_graph(args.input_file)
+    # Graph loaded once by the parent process, shared as CSR arrays
+    blocks, (node_values, indptr, indices, weights) = attach_arrays(shared_csr)
+    n_nodes = len(node_values)
+    # The neighbors are drawn with the magnitude of the weights (the p and q
+    # factors are positive), the sign only tells synonym from antonym
+    abs_weights = np.abs(weights)
     
     # Initialize
     n_samples = args.n_samples
     if n_samples == -1:
-        n_samples = len(node_list)
+        n_samples = n_nodes
     output_array = np.zeros((2 * n_samples, args.max_length), dtype=int)
     print(f"Process {index}: Output array shape {output_array.shape}")
     
+    # Each process has its own generator, seeded from fresh OS entropy:
+    # forked processes would otherwise share the same random state
+    rng = np.random.default_rng()
+    
     # Create shuffled indices more efficiently
-    indices = np.random.permutation(n_samples)
+    indices_order = rng.permutation(n_samples)
     
     # Use tqdm for progress tracking
     pbar = tqdm(total=n_samples, desc=f"Process {index}", position=index)
     
     for n in range(0, n_samples):
-        last_node = 0
-        if n_samples == len(node_list):
-            current_node = node_list[indices[n]]
+        last_node = -1
+        if n_samples == n_nodes:
+            current_node = indices_order[n]
         else:
-            current_node = random.choice(node_list)
-        output_array[n, 0] = current_node
+            current_node = rng.integers(n_nodes)
+        output_array[n, 0] = node_values[current_node]
         current_node_positive = 1
         positive_count = 1
         negative_count = 0
 
         for i in range(1, args.max_length):
-            neighbors = list(G.neighbors(current_node))
-            if not neighbors:
+            if indptr[current_node] == indptr[current_node + 1]:
                 break
-                
-            neighbors_weight = []
-            for nbr in neighbors:
-                weight = G.edges[(current_node, nbr)]['weight']
-                if nbr == last_node:  # d = 0
-                    neighbors_weight.append(p * weight)
-                elif G.has_edge(last_node, nbr):  # d = 1
-                    neighbors_weight.append(weight)
-                else:
-                    neighbors_weight.append(q * weight)  # d = 2
+            neighbors, neighbors_abs_w = neighbors_weight(indptr, indices, abs_weights,
+                                                          current_node, last_node, p, q)
+            row_start = indptr[current_node]
                     
             last_node = current_node
-            indices_weights = np.arange(len(neighbors_weight))
             
             # Handle the case where all weights are zero
-            abs_weights = np.abs(neighbors_weight)
-            if np.sum(abs_weights) <= 0:
+            current_idx = sample_index(neighbors_abs_w, rng)
+            if current_idx is None:
                 # If all weights are zero, use equal weights instead
-                current_idx = random.randint(0, len(neighbors_weight) - 1)
+                current_idx = rng.integers(len(neighbors))
                 print(f"Process {index}: Warning - Zero weights encountered at sample {n}, path position {i}. Using random selection.")
-            else:
-                current_idx = random.choices(indices_weights, weights=abs_weights, k=1)[0]
             
             # neighbor is an antonym of current node
-            if neighbors_weight[current_idx] < 0:
+            if weights[row_start + current_idx] < 0:
                 current_node_positive *= -1
                 
             # add nodes
             current_node = neighbors[current_idx]
             if current_node_positive > 0:
                 # add the node to the current line
-                output_array[n, positive_count] = current_node
+                output_array[n, positive_count] = node_values[current_node]
                 positive_count += 1
             else:
                 # add the node to the opposite of the current line
-                output_array[n_samples + n, negative_count] = current_node
+                output_array[n_samples + n, negative_count] = node_values[current_node]
                 negative_count += 1
         
         # Update progress bar
@@ -187,6 +298,43 @@ def output_polar_edges(args, index):
     print(f"Process {index}: Completed in {execution_time:.2f} seconds")
 
 
+def output_walks_numba(args, index, node_values, indptr, indices, weights, polar=False):
+    """Same output as output_edges (or output_polar_edges if polar) but the
+    walks are generated by the numba kernels from an already built CSR graph."""
+    start_time = time.time()
+    n_nodes = len(node_values)
+    
+    # Initialize
+    n_samples = args.n_samples
+    if n_samples == -1:
+        n_samples = n_nodes
+    # if selecting all nodes, start from every node in random order
+    if n_samples == n_nodes:
+        starts = np.random.permutation(n_samples)
+    else:
+        starts = np.random.randint(n_nodes, size=n_samples)
+    n_rows = 2 * n_samples if polar else n_samples
+    walk_ids = np.full((n_rows, args.max_length), -1, dtype=np.int64)
+    print(f"Walks {index}: Output array shape {walk_ids.shape}")
+    
+    kernel = walk_kernels.polar_walks if polar else walk_kernels.walks
+    zero_weights = kernel(indptr, indices, weights, starts, args.max_length,
+                          1.0 / args.p, 1.0 / args.q, np.random.randint(2**31), walk_ids)
+    if zero_weights:
+        print(f"Walks {index}: Warning - Zero weights encountered {zero_weights} times. Used random selection.")
+    
+    # Node labels, and 0 after the end of the walks
+    output_array = np.where(walk_ids >= 0, node_values[walk_ids], 0)
+    
+    # Save output
+    with open(args.output_directory + str(index) + args.output_name, 'wb') as f:
+        np.save(f, output_array)
+    
+    # Print execution time
+    execution_time = time.time() - start_time
+    print(f"Walks {index}: Completed in {execution_time:.2f} seconds")
+
+
 if __name__ == '__main__':
     argparser = argparse.ArgumentParser()
     # Path
@@ -222,14 +370,34 @@ if __name__ == '__main__':
         target_function = output_edges
         print("Running in normal mode for str_weak edges")
     
-    # Start processing
-    processes = []
-    for local_rank in range(num_processes):
-        p = mp.Process(target=target_function, args=(args, local_rank,))
-        p.start()
-        processes.append(p)
-    for p in processes:
-        p.join()
+    # Load the graph once for all the walks
+    G, node_list = load_graph(args.input_file)
+    csr = build_csr(G, node_list)
+    del G, node_list
+    
+    if walk_kernels is not None:
+        # Each output file is filled by all threads
+        print("Using the numba kernels")
+        for local_rank in range(num_processes):
+            output_walks_numba(args, local_rank, *csr, polar=args.run_mode == "polar")
+    else:
+        # Share the CSR arrays with the worker processes instead of having
+        # each of them load its own copy of the graph
+        blocks, shared_csr = share_arrays(csr)
+        del csr
+        
+        # Start processing
+        processes = []
+        for local_rank in range(num_processes):
+            p = mp.Process(target=target_function, args=(args, local_rank, shared_csr))
+            p.start()
+            processes.append(p)
+        for p in processes:
+            p.join()
+        
+        for block in blocks:
+            block.close()
+            block.unlink()
     
     # Print execution stats
     total_time = time.time() - total_start_time  
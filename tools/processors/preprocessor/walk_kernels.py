@@ -0,0 +1,124 @@
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def has_edge(indptr, indices, u, v):
+    """Binary search of v in the (sorted) neighbors of u"""
+    lo, hi = indptr[u], indptr[u + 1]
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if indices[mid] < v:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo < indptr[u + 1] and indices[lo] == v
+
+
+@njit(cache=True)
+def choose_neighbor(indptr, indices, weights, current, last, p, q, cumulative, polar):
+    """Draw a neighbor of current with the node2vec weights given the
+    previous node last (-1 at the start of a walk). In polar mode the
+    absolute weights are used, as in output_polar_edges; otherwise the
+    weights are used as they are, as in output_edges. cumulative is a buffer
+    of size >= degree of current. Returns the position of the chosen
+    neighbor in the row of current, and whether all the weights were zero."""
+    start, end = indptr[current], indptr[current + 1]
+    total = 0.0
+    for k in range(start, end):
+        nbr = indices[k]
+        if nbr == last:  # d = 0
+            factor = p
+        elif last >= 0 and has_edge(indptr, indices, last, nbr):  # d = 1
+            factor = 1.0
+        else:  # d = 2
+            factor = q
+        weight = abs(weights[k]) if polar else weights[k]
+        total += weight * factor
+        cumulative[k - start] = total
+
+    if total <= 0:
+        # If all weights are zero, use equal weights instead
+        return np.random.randint(0, end - start), True
+
+    target = np.random.random() * total
+    lo, hi = 0, end - start - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if cumulative[mid] <= target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo, False
+
+
+@njit(parallel=True, cache=True)
+def walks(indptr, indices, weights, starts, max_length, p, q, seed, output):
+    """Fill output[n] with a biased random walk starting from starts[n].
+    Positions after a dead end are left untouched (-1). Returns the number of
+    steps where all the weights were zero."""
+    max_degree = 0
+    for node in range(len(indptr) - 1):
+        max_degree = max(max_degree, indptr[node + 1] - indptr[node])
+
+    zero_weights = np.zeros(len(starts), dtype=np.int64)
+    for n in prange(len(starts)):
+        np.random.seed(seed + n)
+        cumulative = np.empty(max_degree)
+        current = starts[n]
+        last = -1
+        output[n, 0] = current
+        for i in range(1, max_length):
+            if indptr[current] == indptr[current + 1]:
+                break
+            position, all_zero = choose_neighbor(indptr, indices, weights,
+                                                 current, last, p, q, cumulative, False)
+            if all_zero:
+                zero_weights[n] += 1
+            last = current
+            current = indices[indptr[current] + position]
+            output[n, i] = current
+    return zero_weights.sum()
+
+
+@njit(parallel=True, cache=True)
+def polar_walks(indptr, indices, weights, starts, max_length, p, q, seed, output):
+    """Same as walks() for signed graphs: the neighbors are drawn with the
+    absolute weights, and crossing a negative edge (antonym) flips the side.
+    Nodes on the side of the start go to output[n], the others to
+    output[len(starts) + n]. Returns the number of steps where all the
+    weights were zero."""
+    n_samples = len(starts)
+    max_degree = 0
+    for node in range(len(indptr) - 1):
+        max_degree = max(max_degree, indptr[node + 1] - indptr[node])
+
+    zero_weights = np.zeros(n_samples, dtype=np.int64)
+    for n in prange(n_samples):
+        np.random.seed(seed + n)
+        cumulative = np.empty(max_degree)
+        current = starts[n]
+        last = -1
+        output[n, 0] = current
+        current_node_positive = 1
+        positive_count = 1
+        negative_count = 0
+        for i in range(1, max_length):
+            if indptr[current] == indptr[current + 1]:
+                break
+            position, all_zero = choose_neighbor(indptr, indices, weights,
+                                                 current, last, p, q, cumulative, True)
+            if all_zero:
+                zero_weights[n] += 1
+            # neighbor is an antonym of current node
+            if weights[indptr[current] + position] < 0:
+                current_node_positive *= -1
+            last = current
+            current = indices[indptr[current] + position]
+            if current_node_positive > 0:
+                output[n, positive_count] = current
+                positive_count += 1
+            else:
+                output[n_samples + n, negative_count] = current
+                negative_count += 1
+    return zero_weights.sum()
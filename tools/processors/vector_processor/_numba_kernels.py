@@ -0,0 +1,78 @@
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+
+@njit(cache=True)
+def _insert(values, indexes, value, index):
+    """Insert (value, index) in the arrays sorted by decreasing value, the
+    last element being dropped."""
+    k = len(values)
+    pos = k - 1
+    while pos > 0 and values[pos - 1] < value:
+        values[pos] = values[pos - 1]
+        indexes[pos] = indexes[pos - 1]
+        pos -= 1
+    values[pos] = value
+    indexes[pos] = index
+
+
+# Kernels already compiled, by dimension of the vectors
+_topk_kernels = {}
+
+
+def _topk_kernel(dim):
+    """Return the kernel filling the top k rows for vectors of dimension dim.
+    dim is a compile-time constant of the kernel, so the dot product loop
+    has a known trip count that the compiler can fully unroll and
+    vectorize. One kernel is compiled (and cached on disk) per dimension."""
+    if dim in _topk_kernels:
+        return _topk_kernels[dim]
+
+    # Only the reassociation of the sums (vectorized dot product) is allowed:
+    # the full fastmath flags assume no infinity, and the top k starts from
+    # -inf sentinels
+    @njit(parallel=True, fastmath={'reassoc', 'contract'}, cache=True)
+    def kernel(matrix, query, exclude, n_blocks, out_idx, out_val):
+        """Fill out_idx and out_val with the rows of matrix having the largest
+        dot product with query (see topk_cosine). Each of the n_blocks blocks
+        of rows is scanned by one thread keeping its own top k, merged at
+        the end."""
+        n_rows = matrix.shape[0]
+        k = len(out_idx)
+        block_size = (n_rows + n_blocks - 1) // n_blocks
+        block_values = np.full((n_blocks, k), -np.inf)
+        block_indexes = np.full((n_blocks, k), -1, dtype=np.int64)
+
+        for b in prange(n_blocks):
+            values = block_values[b]
+            indexes = block_indexes[b]
+            for i in range(b * block_size, min((b + 1) * block_size, n_rows)):
+                if i == exclude:
+                    continue
+                s = 0.0
+                for j in range(dim):
+                    s += matrix[i, j] * query[j]
+                if s > values[k - 1]:
+                    _insert(values, indexes, s, i)
+
+        out_val[:] = -np.inf
+        out_idx[:] = -1
+        for b in range(n_blocks):
+            for n in range(k):
+                if block_indexes[b, n] >= 0 and block_values[b, n] > out_val[k - 1]:
+                    _insert(out_val, out_idx, block_values[b, n], block_indexes[b, n])
+
+    _topk_kernels[dim] = kernel
+    return kernel
+
+
+def topk_cosine(matrix, query, k, exclude=-1):
+    """Return the indexes and the values of the k rows of matrix having the
+    largest dot product with query, by decreasing value (the rows and the
+    query being normalized, it is the cosine similarity). The row exclude
+    (-1 for none) is skipped."""
+    out_idx = np.empty(k, dtype=np.int64)
+    out_val = np.empty(k)
+    kernel = _topk_kernel(matrix.shape[1])
+    kernel(matrix, query, exclude, get_num_threads(), out_idx, out_val)
+    return out_idx, out_val
@@ -3,75 +3,187 @@
 import os
 import sys
 import argparse
+from itertools import chain
 import numpy as np
 from numpy.linalg import norm
 
 
 def cosineSim(v1, v2):
-    """Return the cosine similarity between v1 and v2 (numpy arrays)"""
-    dotProd = np.dot(v1, v2)
-    return dotProd / (np.linalg.norm(v1) * np.linalg.norm(v2))
+    """Return the cosine similarity between v1 and v2 (numpy arrays).
+    The vectors must be normalized (as returned by load_vectors), so the
+    cosine similarity is their dot product."""
+    return float(np.dot(v1, v2))
 
 
-def load_vectors(vector_file):
+# numpy type of the vectors for each supported precision
+PRECISIONS = {'fp32': np.float32, 'fp16': np.float16}
+
+
+def cache_paths(vector_file, precision='fp32'):
+    """
+    Return the paths of the cache files of vector_file: the normalized
+    matrix (.npy, or .fp16.npy in half precision) and the words of its rows
+    (.vocab, one per line).
+    """
+    matrix_file = vector_file + ('.npy' if precision == 'fp32' else f'.{precision}.npy')
+    return matrix_file, vector_file + '.vocab'
+
+
+def load_cache(vector_file, precision='fp32'):
+    """
+    Return the (vocab, matrix) tuple saved by save_cache for vector_file, the
+    matrix being memory-mapped, or None if there is no cache or if it is
+    older than vector_file.
+    """
+    matrix_file, vocab_file = cache_paths(vector_file, precision)
+    try:
+        source_time = os.path.getmtime(vector_file)
+        if os.path.getmtime(matrix_file) < source_time or \
+           os.path.getmtime(vocab_file) < source_time:
+            return None
+        with open(vocab_file, 'r', encoding='utf-8') as f:
+            # The words of a vector file never contain whitespace
+            words = f.read().split()
+        matrix = np.load(matrix_file, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if matrix.ndim != 2 or len(words) != matrix.shape[0] or \
+       matrix.dtype != PRECISIONS[precision]:
+        return None
+    return {word: i for i, word in enumerate(words)}, matrix
+
+
+def save_cache(vector_file, vocab, matrix, precision='fp32'):
+    """
+    Save the normalized matrix and its words next to vector_file, so that
+    the next loads skip the parsing of the text file. Failing to write the
+    cache (read-only directory...) is not an error.
+    """
+    matrix_file, vocab_file = cache_paths(vector_file, precision)
+    try:
+        # Written under temporary names first so that an interrupted write
+        # never leaves a cache that looks valid
+        with open(vocab_file + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(vocab))
+        with open(matrix_file + '.tmp', 'wb') as f:
+            np.save(f, matrix)
+        os.replace(vocab_file + '.tmp', vocab_file)
+        os.replace(matrix_file + '.tmp', matrix_file)
+    except OSError as e:
+        print(f"Warning: could not write the vector cache: {str(e)}")
+
+
+def load_vectors(vector_file, cache=True, precision='fp32', refresh=False):
     """
     Load word vectors from the specified file.
-    Returns a dictionary mapping words to their vectors.
+    Returns a tuple (vocab, matrix): vocab maps each word to its row in
+    matrix, whose rows are the vectors normalized to unit length (zero
+    vectors are kept as is).
+    If cache is True, the result is saved next to the file (see save_cache)
+    and the next calls memory-map it instead of parsing the file again
+    (unless refresh is True, which parses the file and rewrites the cache).
+    With precision 'fp16', the normalized matrix is stored as float16 (half
+    the memory, the similarities being rounded to ~3 digits).
     """
+    if cache and not refresh:
+        cached = load_cache(vector_file, precision)
+        if cached is not None:
+            print(f"Loaded {len(cached[0])} word vectors from the cache of {vector_file}")
+            return cached
+    
     print(f"Loading vectors from {vector_file}...")
-    word_vectors = {}
+    vocab = {}
+    rows = []
     
     try:
         with open(vector_file, 'r', encoding='utf-8') as f:
             # Read first line to get dimensions
-            first_line = f.readline().split()
+            header = f.readline()
+            first_line = header.split()
             if len(first_line) == 2:
                 # First line contains metadata (count, dimensions)
                 nb_vectors = int(first_line[0])
                 vector_dim = int(first_line[1])
                 print(f"Found {nb_vectors} vectors of dimension {vector_dim}")
+                lines = f
             else:
-                # First line already contains a vector
+                # First line already contains a vector, read it with the others
                 vector_dim = len(first_line) - 1
-                word = first_line[0]
-                vector = np.array([float(val) for val in first_line[1:]])
-                word_vectors[word] = vector
+                lines = chain([header], f)
                 
-            # Process remaining lines
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < vector_dim + 1:
+            # Process the vector lines
+            for line in lines:
+                parts = line.split()
+                if len(parts) != vector_dim + 1:
                     continue  # Skip invalid lines
                     
-                word = parts[0]
                 try:
-                    vector = np.array([float(val) for val in parts[1:]])
-                    word_vectors[word] = vector
+                    vector = np.array(parts[1:], dtype=np.float32)
                 except ValueError:
                     continue  # Skip lines with non-numeric values
+                
+                # A word seen twice keeps its last vector
+                word = parts[0]
+                if word in vocab:
+                    rows[vocab[word]] = vector
+                else:
+                    vocab[word] = len(rows)
+                    rows.append(vector)
                     
     except Exception as e:
         print(f"Error loading vectors: {str(e)}")
         sys.exit(1)
+    
+    # One contiguous matrix instead of one array object per word
+    matrix = np.array(rows, dtype=np.float32).reshape(len(rows), vector_dim)
+        
+    # Normalize once here so that each similarity is a single dot product
+    norms = norm(matrix, axis=1)
+    matrix /= np.where(norms == 0, 1, norms)[:, np.newaxis]
         
-    print(f"Successfully loaded {len(word_vectors)} word vectors")
-    return word_vectors
+    if precision != 'fp32':
+        matrix = matrix.astype(PRECISIONS[precision])
+        
+    print(f"Successfully loaded {len(vocab)} word vectors")
+    if cache:
+        save_cache(vector_file, vocab, matrix, precision)
+    return vocab, matrix
+
+
+def quantize_vectors(matrix):
+    """
+    Quantize the (normalized) rows of the matrix to int8.
+    Returns a tuple (quantized, scales): each row is stored as
+    round(row / scale) with scale = max(|row|) / 127, so that
+    row ~= quantized_row * scale, with 4 times less memory.
+    """
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1
+    quantized = np.rint(matrix / scales[:, np.newaxis]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
 
 
 def calculate_similarity(word1, word2, vectors):
     """
-    Calculate similarity between two words using their vectors.
+    Calculate similarity between two words using their vectors
+    ((vocab, matrix) tuple returned by load_vectors).
+    The rows of the matrix are unit vectors, so their dot product is exactly
+    the cosine similarity (0 if one of the words has a zero vector).
     """
-    if word1 not in vectors:
+    vocab, matrix = vectors
+    # One dictionary lookup per word, the row is None if the word is unknown
+    row1 = vocab.get(word1)
+    if row1 is None:
         print(f"Word '{word1}' not found in vectors")
         return None
         
-    if word2 not in vectors:
+    row2 = vocab.get(word2)
+    if row2 is None:
         print(f"Word '{word2}' not found in vectors")
         return None
         
-    v1 = vectors[word1]
-    v2 = vectors[word2]
+    v1 = matrix[row1].astype(np.float32)
+    v2 = matrix[row2].astype(np.float32)
     
     return cosineSim(v1, v2)
 
@@ -84,11 +196,13 @@ def main():
                         help='First word to compare')
     parser.add_argument('--word2', type=str, required=True,
                         help='Second word to compare')
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Do not read nor write the .npy/.vocab cache of the vector file')
     
     args = parser.parse_args()
     
     # Load vectors
-    vectors = load_vectors(args.vector_file)
+    vectors = load_vectors(args.vector_file, cache=not args.no_cache)
     
     # Calculate similarity
     similarity = calculate_similarity(args.word1, args.word2, vectors)
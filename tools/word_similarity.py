@@ -3,7 +3,35 @@
 import sys
 import os
 import argparse
-from processors.vector_processor.similarity import load_vectors, calculate_similarity
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from processors.vector_processor.similarity import load_vectors, calculate_similarity, quantize_vectors
+
+# numba is optional: with it, the scores and the top N are computed in one
+# parallel pass over the matrix, without a score array for all the words
+try:
+    from processors.vector_processor import _numba_kernels
+except ImportError:
+    _numba_kernels = None
+
+# simsimd is optional: without numba, its SIMD kernels (chosen at runtime for
+# the CPU) compute the dot products of the query with all the words
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+# Number of float16 or int8 rows converted to float32 at once when simsimd
+# is not available
+CONVERSION_BLOCK_SIZE = 16384
+
+# Number of rows scored at once by top_similar: the scores of all the
+# queries for one block stay small, whatever the size of the vocabulary
+SCAN_BLOCK_SIZE = 65536
+
+# (numpy matrix, torch tensor) of the matrix last copied to the GPU
+_device_matrix = (None, None)
 
 
 def main():
@@ -17,17 +45,40 @@ def main():
     parser.add_argument('--f', '--file', dest='vector_file', type=str, required=True,
                         help='Path to the word vector file')
     parser.add_argument('--top_n', '-n', type=int, default=0,
-                        help='Find top N most similar words to word1 (if specified)')
+                        help='Find top N most similar words to word1 (if specified), or to each '
+                             'word when more than two words are given')
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Do not read nor write the .npy/.vocab cache of the vector file')
+    parser.add_argument('--refresh_cache', action='store_true',
+                        help='Parse the vector file again and rewrite its cache '
+                             '(normalized vectors and words). No word is needed with this option')
+    parser.add_argument('--precision', type=str, choices=['fp32', 'fp16'], default='fp32',
+                        help='Precision of the normalized vectors kept in memory and in the cache '
+                             '(fp16 halves the memory, similarities rounded to ~3 digits)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Number of threads scanning the vectors for the top N words '
+                             '(useful with simsimd, float16/int8 vectors or a single-threaded BLAS)')
+    parser.add_argument('--device', type=str, choices=['cpu', 'cuda'], default='cpu',
+                        help='Device computing the top N words (cuda needs PyTorch with CUDA, '
+                             'falls back to cpu otherwise)')
+    parser.add_argument('--quantize', type=str, choices=['none', 'int8'], default='none',
+                        help='Search the top N words on vectors quantized to int8 '
+                             '(4 times less memory read, approximate similarities)')
     
     # Positional arguments for word1 and word2
-    parser.add_argument('words', type=str, nargs='+', 
-                        help='One or two words to compare')
+    parser.add_argument('words', type=str, nargs='*', 
+                        help='One or two words to compare. With more than two words, the top N '
+                             'most similar words of each word are printed (no pair similarity)')
     
     args = parser.parse_args()
+    if not args.words and not args.refresh_cache:
+        parser.error("at least one word is required")
+    if args.refresh_cache and args.no_cache:
+        parser.error("--refresh_cache writes the cache, it cannot be used with --no_cache")
     
     # Process word arguments
     word1 = args.words[0] if len(args.words) > 0 else None
-    word2 = args.words[1] if len(args.words) > 1 else None
+    word2 = args.words[1] if len(args.words) == 2 else None
     
     # Check if vector file exists
     if not os.path.isfile(args.vector_file):
@@ -35,52 +86,240 @@ def main():
         sys.exit(1)
     
     # Load vectors
-    vectors = load_vectors(args.vector_file)
+    vectors = load_vectors(args.vector_file, cache=not args.no_cache,
+                           precision=args.precision, refresh=args.refresh_cache)
+    if not args.words:
+        return
+    quantized = quantize_vectors(vectors[1]) if args.quantize == 'int8' else None
     
     # Calculate similarity between two words
     if word1 and word2:
-        similarity = calculate_similarity(word1, word2, vectors)
+        pair_similarity = make_pair_similarity(vectors)
+        similarity = pair_similarity(word1, word2)
         
         if similarity is not None:
             print(f"Similarity between '{word1}' and '{word2}': {similarity:.4f}")
         else:
             print("Could not calculate similarity")
     
-    # Find top N similar words (either when explicitly requested or when word2 is not provided)
-    if args.top_n > 0 or (word1 and not word2):
+    # Find top N similar words (either when explicitly requested or when
+    # there are not exactly two words to compare): those of word1 when
+    # two words are compared, those of each word otherwise
+    if args.top_n > 0 or not word2:
         top_n = args.top_n if args.top_n > 0 else 10  # Default to 10 if not specified
-        if word1 in vectors:
-            print(f"\nTop {top_n} words most similar to '{word1}':")
-            find_most_similar(word1, vectors, top_n)
+        query_words = [word1] if word2 else args.words
+        find_most_similar_batch(query_words, vectors, top_n, quantized, args.threads,
+                                args.device)
+
+def make_pair_similarity(vectors):
+    """
+    Return a function (word1, word2) -> similarity, same as
+    calculate_similarity with the given vectors but computing each pair of
+    words only once. The similarity is symmetric, so (word1, word2) and
+    (word2, word1) share the same cache entry.
+    """
+    @lru_cache(maxsize=65536)
+    def cached_similarity(word1, word2):
+        return calculate_similarity(word1, word2, vectors)
+    
+    def pair_similarity(word1, word2):
+        if word1 > word2:
+            word1, word2 = word2, word1
+        return cached_similarity(word1, word2)
+    
+    return pair_similarity
 
 
-def find_most_similar(word, vectors, top_n):
+def fill_similarities(matrix, queries, out):
     """
-    Find the top N most similar words to the given word.
+    Write in out the similarities between the (K, D) queries and all the
+    rows of the matrix.
     """
-    if word not in vectors:
-        print(f"Word '{word}' not found in vectors")
-        return
+    if simsimd is not None:
+        out[:] = np.asarray(simsimd.cdist(queries, matrix, metric="dot"))
+    elif matrix.dtype == np.float32:
+        # One matrix product for all the queries instead of one per query
+        if out.flags.c_contiguous:
+            np.dot(queries, matrix.T, out=out)
+        else:
+            out[:] = queries @ matrix.T
+    else:
+        # numpy has no BLAS product for float16, and no wide accumulator for
+        # int8: the rows are converted to float32 by blocks (integer dot
+        # products of int8 rows are exact in float32 up to ~1000 dimensions)
+        queries = queries.astype(np.float32)
+        for start in range(0, len(matrix), CONVERSION_BLOCK_SIZE):
+            block = matrix[start:start + CONVERSION_BLOCK_SIZE].astype(np.float32)
+            out[:, start:start + len(block)] = queries @ block.T
+
+
+def similarities(matrix, queries, threads=1):
+    """
+    Return the similarities between the (normalized) query vectors and all
+    the rows of the matrix (float32, float16 or int8), as a float32 numpy
+    array. queries is one vector (the result has one similarity per row)
+    or a (K, D) array of K vectors (the result is a (K, rows) array).
+    With threads > 1, the rows are split in blocks scored in parallel
+    threads (numpy and simsimd release the GIL).
+    """
+    single = queries.ndim == 1
+    queries = np.atleast_2d(queries)
+    scores = np.empty((len(queries), len(matrix)), dtype=np.float32)
+    if threads > 1 and len(matrix) >= threads:
+        bounds = np.linspace(0, len(matrix), threads + 1, dtype=np.int64).tolist()
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(
+                lambda start, end: fill_similarities(matrix[start:end], queries,
+                                                     scores[:, start:end]),
+                bounds[:-1], bounds[1:]))
+    else:
+        fill_similarities(matrix, queries, scores)
+    return scores[0] if single else scores
+
+
+def int8_similarities(quantized, indexes, threads=1, rows=slice(None)):
+    """
+    Return the approximate similarities between the rows indexes and the
+    rows (all by default) of the int8 matrix ((quantized, scales) tuple
+    returned by quantize_vectors), as a (len(indexes), rows) numpy array.
+    """
+    matrix, scales = quantized
+    dots = similarities(matrix[rows], matrix[indexes], threads)
+    dots *= scales[rows]
+    dots *= scales[indexes][:, np.newaxis]
+    return dots
+
+
+def gpu_top_similar(indexes, matrix, top_n, device):
+    """
+    Same as top_similar, computed by PyTorch on device. The matrix is copied
+    to the device once and kept for the next calls. Returns None if PyTorch
+    or the device is not available.
+    """
+    global _device_matrix
+    # Imported here: PyTorch is slow to import and only needed for this path
+    try:
+        import torch
+    except ImportError:
+        print("Warning: PyTorch is not installed, using the CPU")
+        return None
+    if not torch.cuda.is_available():
+        print(f"Warning: device '{device}' is not available, using the CPU")
+        return None
     
-    target_vector = vectors[word]
-    similarities = {}
+    if _device_matrix[0] is not matrix:
+        # Copied by blocks: a memory-mapped matrix is never fully read at once
+        dtype = torch.float16 if matrix.dtype == np.float16 else torch.float32
+        gpu_matrix = torch.empty(matrix.shape, dtype=dtype, device=device)
+        for start in range(0, len(matrix), SCAN_BLOCK_SIZE):
+            block = np.array(matrix[start:start + SCAN_BLOCK_SIZE])
+            gpu_matrix[start:start + len(block)] = torch.from_numpy(block).to(device)
+        _device_matrix = (matrix, gpu_matrix)
+    gpu_matrix = _device_matrix[1]
     
-    # Calculate similarity with all other words
-    for other_word, vector in vectors.items():
-        if other_word == word:
-            continue
+    gpu_indexes = torch.from_numpy(indexes).to(device)
+    scores = (gpu_matrix[gpu_indexes] @ gpu_matrix.T).float()
+    scores[torch.arange(len(indexes), device=device), gpu_indexes] = -np.inf
+    top_scores, top_indices = torch.topk(scores, top_n, dim=1)
+    return list(zip(top_indices.cpu().numpy(), top_scores.cpu().numpy()))
+
+
+def top_similar(indexes, vectors, top_n, quantized=None, threads=1, device='cpu'):
+    """
+    Return, for each row index of indexes, the (rows, similarities) numpy
+    arrays of its top N most similar rows, by decreasing similarity.
+    The rows of the matrix are normalized, so the similarities of all the
+    queries are computed together by matrix products (or, for one query, by
+    the numba kernel when available). The matrix is scanned by blocks of
+    SCAN_BLOCK_SIZE rows, keeping the best N rows of each query so far.
+    If quantized is given (see quantize_vectors), the search is done on the
+    int8 vectors. threads is the number of threads of the scan (see
+    similarities). With a device other than 'cpu', the search is done by
+    gpu_top_similar on the (not quantized) matrix.
+    """
+    vocab, matrix = vectors
+    indexes = np.asarray(indexes, dtype=np.int64)
+    top_n = min(top_n, len(matrix) - 1)
+    if top_n <= 0:
+        return [(np.empty(0, dtype=np.int64), np.empty(0)) for _ in indexes]
+    
+    if device != 'cpu':
+        results = gpu_top_similar(indexes, matrix, top_n, device)
+        if results is not None:
+            return results
+    
+    if len(indexes) == 1 and _numba_kernels is not None and \
+       quantized is None and matrix.dtype == np.float32:
+        return [_numba_kernels.topk_cosine(matrix, matrix[indexes[0]], top_n,
+                                           exclude=indexes[0])]
+    
+    top_indices = np.empty((len(indexes), 0), dtype=np.int64)
+    top_scores = np.empty((len(indexes), 0), dtype=np.float32)
+    for start in range(0, len(matrix), SCAN_BLOCK_SIZE):
+        rows = slice(start, min(start + SCAN_BLOCK_SIZE, len(matrix)))
         
-        similarity = calculate_similarity(word, other_word, vectors)
-        if similarity is not None:
-            similarities[other_word] = similarity
+        # Calculate similarity with the words of this block
+        if quantized is not None:
+            scores = int8_similarities(quantized, indexes, threads, rows)
+        else:
+            scores = similarities(matrix[rows], matrix[indexes], threads)
+        in_block = (indexes >= rows.start) & (indexes < rows.stop)
+        scores[in_block.nonzero()[0], indexes[in_block] - start] = -np.inf
+        
+        # Best rows of the block, merged with the best rows so far
+        block_n = min(top_n, rows.stop - rows.start)
+        best = np.argpartition(-scores, block_n - 1, axis=1)[:, :block_n]
+        top_scores = np.concatenate(
+            [top_scores, np.take_along_axis(scores, best, axis=1)], axis=1)
+        top_indices = np.concatenate([top_indices, best + start], axis=1)
+        if top_scores.shape[1] > top_n:
+            best = np.argpartition(-top_scores, top_n - 1, axis=1)[:, :top_n]
+            top_scores = np.take_along_axis(top_scores, best, axis=1)
+            top_indices = np.take_along_axis(top_indices, best, axis=1)
     
-    # Sort by similarity (descending)
-    sorted_similarities = sorted(similarities.items(), key=lambda x: x[1], reverse=True)
+    # Only the top N are sorted by similarity (descending)
+    order = np.argsort(-top_scores, axis=1)
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return list(zip(top_indices, top_scores))
+
+
+def find_most_similar_batch(query_words, vectors, top_n, quantized=None, threads=1,
+                            device='cpu'):
+    """
+    Find the top N most similar words to each of the given words, all the
+    words being searched together.
+    """
+    vocab, matrix = vectors
+    found = []
+    for word in query_words:
+        if word in vocab:
+            found.append(word)
+        else:
+            print(f"Word '{word}' not found in vectors")
+    if not found:
+        return
     
-    # Print top N
-    for i, (similar_word, similarity) in enumerate(sorted_similarities[:top_n]):
-        print(f"{i+1}. {similar_word}: {similarity:.4f}")
+    # Words in the order of the rows of the matrix
+    words = list(vocab)
+    results = top_similar([vocab[word] for word in found], vectors, top_n,
+                          quantized, threads, device)
+    for word, (top_indices, top_scores) in zip(found, results):
+        print(f"\nTop {top_n} words most similar to '{word}':")
+        print_most_similar(words, top_indices, top_scores)
+
 
+def print_most_similar(words, top_indices, top_scores):
+    """
+    Print the words of the rows top_indices with their similarities.
+    The lines are joined and written at once instead of one print per word.
+    """
+    if len(top_indices) == 0:
+        return
+    lines = [f"{i+1}. {words[similar_index]}: {similarity:.4f}"
+             for i, (similar_index, similarity) in enumerate(zip(top_indices.tolist(),
+                                                                 top_scores.tolist()))]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file